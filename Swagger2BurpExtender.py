@@ -6,21 +6,68 @@
 from burp import IBurpExtender, ITab, IExtensionStateListener
 
 from java.awt import BorderLayout, GridBagLayout, GridBagConstraints, Insets
-from javax.swing import JPanel, JLabel, JTextField, JTextArea, JButton, JScrollPane, JCheckBox, JComboBox, BorderFactory, JTabbedPane, SwingUtilities
-
+from javax.swing import JPanel, JLabel, JTextField, JTextArea, JButton, JScrollPane, JCheckBox, JComboBox, BorderFactory, JTabbedPane, SwingUtilities, JTable, ListSelectionModel, JSplitPane, JProgressBar, JFileChooser, Timer
+from javax.swing.table import AbstractTableModel
+from javax.swing.event import DocumentListener
+from java.lang import Boolean, String
+
+import base64
+import copy
+import hashlib
+import itertools
 import json
+from json.decoder import scanstring
+import os
+import random
 import re
 import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
 
 # Python 2 compatible imports
 try:
     # Jython/Python2
     import urllib2 as urllib_request
     from urlparse import urlparse, urljoin
+    from urllib import unquote, quote as _quote
 except Exception:
     # Fallback if running in different environment
     import urllib.request as urllib_request
-    from urllib.parse import urlparse, urljoin
+    from urllib.parse import urlparse, urljoin, unquote, quote as _quote
+
+try:
+    _string_types = (str, unicode)
+except NameError:
+    _string_types = (str,)
+
+_SPEC_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_SPEC_CACHE_MAX_ENTRIES = 256
+_MAX_REPORTED_FAILURES = 50
+_EMPTY_BYTES = ''.encode('ascii')
+_STREAM_MIN_CHARS = 4 * 1024 * 1024
+_DISCOVERY_CONCURRENCY = 8
+_PROGRESS_STEP = 250
+_SAMPLE_MAX_DEPTH = 32
+_SAMPLE_MAX_NODES = 5000
+_MAX_EXTERNAL_DOCS = 500
+_OVERSIZED_CHARS = 10000
+_OVERSIZED_ITEMS = 100
+_CANCEL_GRACE_SECONDS = 2.0
+_MAX_BASE_URLS = 256
+_FILTER_DELAY_MS = 150
+_STATE_KEY = 'swagger2burp.state'
+_SELECTION_KEY = 'swagger2burp.selection'
+_STATE_CHUNK_CHARS = 8000
+_STATE_VERSION = 3
+
+_DEBUG, _INFO, _WARN, _ERROR = 10, 20, 30, 40
+_LOG_LEVEL_NAMES = ['DEBUG', 'INFO', 'WARN', 'ERROR']
+_LOG_LEVELS = {'DEBUG': _DEBUG, 'INFO': _INFO, 'WARN': _WARN, 'ERROR': _ERROR}
+_LOG_CAPACITY = 20000
+_LOG_MAX_UI_LINES = 5000
+_LOG_FLUSH_MS = 250
 
 
 def _strip(s):
@@ -32,7 +79,7 @@ def _strip(s):
 def _safe_get(dct, *keys):
     cur = dct
     for k in keys:
-        if not isinstance(cur, dict) or k not in cur:
+        if not _is_map(cur) or k not in cur:
             return None
         cur = cur[k]
     return cur
@@ -45,9 +92,68 @@ def _first_non_empty(*vals):
     return None
 
 
+_NON_WS = re.compile(r'\S')
+
+
+def _first_non_ws(text):
+    # index of the first non-whitespace char, or -1; only scans the prefix
+    m = _NON_WS.search(text or '')
+    return m.start() if m else -1
+
+
+def _last_non_ws_char(text):
+    i = len(text) - 1
+    while i >= 0 and text[i].isspace():
+        i -= 1
+    return text[i] if i >= 0 else ''
+
+
 def _is_json_text(text):
-    t = text.strip()
-    return (t.startswith("{") and t.endswith("}")) or (t.startswith("[") and t.endswith("]"))
+    # checks the first and last non-whitespace chars without copying `text`
+    i = _first_non_ws(text)
+    if i < 0:
+        return False
+    first = text[i]
+    if first != '{' and first != '[':
+        return False
+    last = _last_non_ws_char(text)
+    return (first == '{' and last == '}') or (first == '[' and last == ']')
+
+
+def _source_label(kind, src):
+    # short description for log lines; never dumps pasted documents
+    if kind == 'url':
+        return src
+    if kind == 'json':
+        return 'pasted JSON'
+    return 'pasted text'
+
+
+def _sniff_format(text):
+    # One look at the first non-whitespace char: 'json', 'yaml', 'html' or
+    # 'empty'. Content-Type is not consulted; servers often label JSON and
+    # YAML specs text/html.
+    i = _first_non_ws(text)
+    if i < 0:
+        return 'empty'
+    first = text[i]
+    if first == '{' or first == '[':
+        return 'json'
+    if first == '<':
+        return 'html'
+    return 'yaml'
+
+
+def _source_kind(src):
+    # 'json' (pasted JSON), 'url' or 'text' (pasted YAML), or None when blank
+    i = _first_non_ws(src)
+    if i < 0:
+        return None
+    if src[i] == '{' or src[i] == '[':
+        return 'json'
+    if src.startswith('http://', i) or src.startswith('https://', i):
+        return 'url'
+    return 'text'
 
 
 def _read_url(url, headers):
@@ -109,8 +215,121 @@ except Exception:
     _SnakeYaml = None
 
 
+class _JavaMapView(object):
+    # Read-only mapping over a SnakeYAML java.util.Map. Nested maps/lists are
+    # wrapped on first access (and the wrapper kept, so identity is stable);
+    # nothing is copied, so sections never read are never converted.
+    __slots__ = ('_obj', '_children')
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._children = {}
+
+    def _wrap(self, key, value):
+        if key in self._children:
+            return self._children[key]
+        view = _java_view(value)
+        if view is not value:
+            self._children[key] = view
+        return view
+
+    def __getitem__(self, key):
+        if not self._obj.containsKey(key):
+            raise KeyError(key)
+        return self._wrap(key, self._obj.get(key))
+
+    def get(self, key, default=None):
+        if not self._obj.containsKey(key):
+            return default
+        return self._wrap(key, self._obj.get(key))
+
+    def __contains__(self, key):
+        return self._obj.containsKey(key)
+
+    def __len__(self):
+        return self._obj.size()
+
+    def __iter__(self):
+        it = self._obj.keySet().iterator()
+        while it.hasNext():
+            yield it.next()
+
+    def keys(self):
+        return list(self.__iter__())
+
+    def items(self):
+        it = self._obj.entrySet().iterator()
+        while it.hasNext():
+            e = it.next()
+            yield e.getKey(), self._wrap(e.getKey(), e.getValue())
+
+    def values(self):
+        for _, v in self.items():
+            yield v
+
+    def __deepcopy__(self, memo):
+        return _to_py(self)
+
+
+class _JavaListView(object):
+    # Read-only sequence over a SnakeYAML java.util.List; see _JavaMapView.
+    __slots__ = ('_obj', '_children')
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._children = {}
+
+    def __len__(self):
+        return self._obj.size()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = self._obj.size()
+        if i < 0:
+            i += n
+        if i < 0 or i >= n:
+            raise IndexError(i)
+        if i in self._children:
+            return self._children[i]
+        value = self._obj.get(i)
+        view = _java_view(value)
+        if view is not value:
+            self._children[i] = view
+        return view
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __deepcopy__(self, memo):
+        return _to_py(self)
+
+
+def _java_view(obj):
+    if _JavaMap is not None and isinstance(obj, _JavaMap):
+        return _JavaMapView(obj)
+    if _JavaList is not None and isinstance(obj, _JavaList):
+        return _JavaListView(obj)
+    return obj
+
+
+_MAP_TYPES = (dict, _JavaMapView)
+_SEQ_TYPES = (list, tuple, _JavaListView)
+
+
+def _is_map(obj):
+    return isinstance(obj, _MAP_TYPES)
+
+
+def _is_seq(obj):
+    return isinstance(obj, _SEQ_TYPES)
+
+
 def _to_py(obj):
-    # Convert Java Map/List from SnakeYAML to Python types
+    # Materialize Java Map/List (or views over them) as Python types
+    if isinstance(obj, (_JavaMapView, _JavaListView)):
+        obj = obj._obj
     try:
         if _JavaMap is not None and isinstance(obj, _JavaMap):
             py = {}
@@ -138,7 +357,8 @@ def _parse_yaml(text):
         raise Exception('YAML parsing not available (SnakeYAML jar not on classpath).')
     y = _SnakeYaml()
     data = y.load(text)
-    return _to_py(data)
+    # lazy read-only view; nodes are converted only when accessed
+    return _java_view(data)
 
 
 def _looks_like_url(s):
@@ -192,6 +412,222 @@ def _load_spec_from_source(src, fetch_headers):
     return _parse_yaml(s)
 
 
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WS = re.compile(r'[ \t\n\r]*')
+_JSON_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_JSON_SKIP = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+
+
+def _json_skip_value(text, idx):
+    # Index just past the JSON value starting at idx, without building it.
+    c = text[idx:idx + 1]
+    if c == '{' or c == '[':
+        depth = 0
+        for m in _JSON_SKIP.finditer(text, idx):
+            tok = m.group()
+            if tok == '{' or tok == '[':
+                depth += 1
+            elif tok == '}' or tok == ']':
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        raise ValueError('Unterminated JSON value at char %d' % idx)
+    if c == '"':
+        m = _JSON_STRING.match(text, idx)
+        if m is None:
+            raise ValueError('Unterminated JSON string at char %d' % idx)
+        return m.end()
+    return _JSON_DECODER.raw_decode(text, idx)[1]
+
+
+def _iter_json_members(text, start, skip_keys=None):
+    # Yield (key, value, value_start, value_end) for each member of the JSON
+    # object at `start`. Members named in `skip_keys` are stepped over
+    # without decoding and yield None as their value.
+    idx = _JSON_WS.match(text, start + 1).end()
+    if text[idx:idx + 1] == '}':
+        return
+    while True:
+        if text[idx:idx + 1] != '"':
+            raise ValueError('Expecting property name at char %d' % idx)
+        key, idx = scanstring(text, idx + 1)
+        idx = _JSON_WS.match(text, idx).end()
+        if text[idx:idx + 1] != ':':
+            raise ValueError("Expecting ':' at char %d" % idx)
+        vstart = _JSON_WS.match(text, idx + 1).end()
+        if skip_keys and key in skip_keys:
+            value, vend = None, _json_skip_value(text, vstart)
+        else:
+            value, vend = _JSON_DECODER.raw_decode(text, vstart)
+        yield key, value, vstart, vend
+        idx = _JSON_WS.match(text, vend).end()
+        c = text[idx:idx + 1]
+        if c == ',':
+            idx = _JSON_WS.match(text, idx + 1).end()
+        elif c == '}':
+            return
+        else:
+            raise ValueError("Expecting ',' or '}' at char %d" % idx)
+
+
+class _LazyJsonObject(object):
+    # Read-only view of a JSON object inside `text`. Members are decoded one
+    # at a time while iterating, so only the current one is materialized.
+    def __init__(self, text, start):
+        self._text = text
+        self._start = start
+
+    def __bool__(self):
+        return self._text[_JSON_WS.match(self._text, self._start + 1).end()] != '}'
+
+    __nonzero__ = __bool__
+
+    def items(self):
+        for key, value, _, _ in _iter_json_members(self._text, self._start):
+            yield key, value
+
+    def keys(self):
+        for key, _, _, _ in _iter_json_members(self._text, self._start, _ALL_KEYS):
+            yield key
+
+    __iter__ = keys
+
+    def get(self, name, default=None):
+        for key, _, vstart, _ in _iter_json_members(self._text, self._start, _ALL_KEYS):
+            if key == name:
+                return _JSON_DECODER.raw_decode(self._text, vstart)[0]
+        return default
+
+
+class _AllKeys(object):
+    def __contains__(self, key):
+        return True
+
+
+_ALL_KEYS = _AllKeys()
+
+
+class _StreamingJsonSpec(dict):
+    # Spec decoded member by member from the raw JSON text. Top-level members
+    # other than `paths` (info, servers, components, definitions, ...) are
+    # decoded up front so $refs can be indexed; `paths` stays a
+    # _LazyJsonObject and each path item is decoded only when _process_spec
+    # reaches it, so the full document tree never exists at once.
+    def __init__(self, text):
+        dict.__init__(self)
+        idx = _JSON_WS.match(text, 0).end()
+        if text[idx:idx + 1] != '{':
+            raise ValueError('Not a JSON object')
+        for key, value, vstart, vend in _iter_json_members(text, idx, ('paths',)):
+            if key == 'paths' and text[vstart:vstart + 1] == '{':
+                value = _LazyJsonObject(text, vstart)
+            elif key == 'paths':
+                value = _JSON_DECODER.raw_decode(text, vstart)[0]
+            self[key] = value
+
+
+def _loads_json(text, stream=False):
+    if stream and len(text) >= _STREAM_MIN_CHARS:
+        try:
+            return _StreamingJsonSpec(text)
+        except ValueError:
+            pass
+    return json.loads(text)
+
+
+_UI_URL = re.compile(r'''["']?\burl["']?\s*:\s*["']([^"']+)["']''')
+_UI_URLS = re.compile(r'''["']?\burls["']?\s*:\s*\[(.*?)\]''', re.S)
+_UI_CONFIG_URL = re.compile(r'''["']?\bconfigUrl["']?\s*:\s*["']([^"']+)["']''')
+_UI_SWAGGER_DOC = re.compile(r'''["']?\bswaggerDoc["']?\s*:\s*(?=\{)''')
+_UI_SCRIPT_SRC = re.compile(r'''<script[^>]+src\s*=\s*["']([^"']+)["']''', re.I)
+_WELL_KNOWN_SPEC_PATHS = (
+    '/v3/api-docs', '/v2/api-docs', '/openapi.json', '/swagger.json', '/api-docs',
+    '/swagger/v1/swagger.json', '/api/swagger.json', '/openapi.yaml', '/swagger.yaml',
+    '/v3/api-docs/swagger-config',
+)
+
+
+def _extract_ui_config(text):
+    # Pull spec locations out of a Swagger UI page or init script:
+    # url/urls/configUrl values, an inline swaggerDoc and init script srcs.
+    found = {'urls': [], 'configs': [], 'scripts': [], 'doc': None}
+    m = _UI_SWAGGER_DOC.search(text)
+    if m is not None:
+        try:
+            doc = _JSON_DECODER.raw_decode(text, m.end())[0]
+            if _looks_like_spec(doc):
+                found['doc'] = doc
+        except ValueError:
+            pass
+    for m in _UI_URLS.finditer(text):
+        found['urls'].extend(_UI_URL.findall(m.group(1)))
+    for u in _UI_URL.findall(text):
+        if u not in found['urls']:
+            found['urls'].append(u)
+    found['configs'] = _UI_CONFIG_URL.findall(text)
+    for src in _UI_SCRIPT_SRC.findall(text):
+        name = src.rsplit('/', 1)[-1].lower()
+        # swagger-ui-init.js / swagger-initializer.js, not the UI bundle itself
+        if 'init' in name:
+            found['scripts'].append(src)
+    return found
+
+
+def _config_spec_urls(config):
+    urls = []
+    if isinstance(config.get('url'), _string_types):
+        urls.append(config['url'])
+    entries = config.get('urls')
+    if _is_seq(entries):
+        for e in entries:
+            if _is_map(e) and isinstance(e.get('url'), _string_types):
+                urls.append(e['url'])
+    return urls
+
+
+def _looks_like_spec(obj):
+    return _is_map(obj) and (obj.get('openapi') is not None or obj.get('swagger') is not None)
+
+
+def _ui_base_urls(page_url):
+    # relative references resolve against the page; '/docs' is usually
+    # served as '/docs/', so try the directory form as well
+    bases = [page_url]
+    path = urlparse(page_url).path or '/'
+    if not path.endswith('/') and '.' not in path.rsplit('/', 1)[-1]:
+        bases.append(page_url.split('?', 1)[0].split('#', 1)[0] + '/')
+    return bases
+
+
+def _same_origin(url, other):
+    a, b = urlparse(url), urlparse(other)
+    return (a.scheme.lower(), a.netloc.lower()) == (b.scheme.lower(), b.netloc.lower())
+
+
+def _well_known_spec_urls(page_url):
+    u = urlparse(page_url)
+    origin = u.scheme + '://' + u.netloc
+    page = (u.path or '/').rstrip('/')
+    urls = []
+    if page:
+        # NestJS serves the document for '/api' at '/api-json'
+        urls.append(origin + page + '-json')
+        urls.append(origin + page + '/swagger.json')
+        urls.append(origin + page + '/openapi.json')
+    urls.extend(origin + p for p in _WELL_KNOWN_SPEC_PATHS)
+    return urls
+
+
+def _unique(items):
+    seen = set()
+    out = []
+    for x in items:
+        if x not in seen:
+            seen.add(x)
+            out.append(x)
+    return out
+
+
 def _parse_custom_headers(text):
     headers = []
     for line in text.splitlines():
@@ -241,64 +677,438 @@ def _choose_base_from_swagger2(spec):
     return scheme + '://' + host + base_path
 
 
-def _join_url(base, path):
-    if not base:
-        base = '/'
-    if not path:
-        path = '/'
-    # use urljoin for correctness
-    try:
-        return urljoin(base.rstrip('/') + '/', path.lstrip('/'))
-    except Exception:
-        # very defensive fallback
-        if base.endswith('/') and path.startswith('/'):
-            return base[:-1] + path
-        elif not base.endswith('/') and not path.startswith('/'):
-            return base + '/' + path
-        return base + path
+def _oas3_server_urls(spec):
+    # Every servers[] entry, expanded over the enum values of its variables.
+    # Variables without an enum use their default, like _choose_base_from_oas3.
+    urls = []
+    servers = spec.get('servers') or []
+    for server in servers if _is_seq(servers) else []:
+        if not _is_map(server):
+            continue
+        url = server.get('url') or '/'
+        vars_def = server.get('variables') or {}
+        names = _unique(re.findall(r"\{([^}]+)\}", url))
+        choices = []
+        for name in names:
+            d = vars_def.get(name) if _is_map(vars_def) else None
+            values = []
+            if _is_map(d):
+                if _is_seq(d.get('enum')):
+                    values = [str(v) for v in d.get('enum') if v is not None]
+                if not values:
+                    v = _first_non_empty(d.get('default'), d.get('example'))
+                    if v is not None:
+                        values = [str(v)]
+            choices.append(values or [name])
+        for combo in itertools.product(*choices):
+            bound = dict(zip(names, combo))
+            urls.append(re.sub(r"\{([^}]+)\}", lambda m: bound.get(m.group(1), m.group(1)), url))
+            if len(urls) >= _MAX_BASE_URLS:
+                return _unique(urls)
+    return _unique(urls)
+
+
+def _split_base_urls(text):
+    return _unique(b for b in re.split(r"[\s,]+", text or '') if b)
+
+
+def _base_urls(spec, base_override, opts):
+    # Bases an operation is bound to: the override list, every server and
+    # variable combination (fan-out), or the first server / basePath.
+    # [None] means there is no usable base.
+    override = _split_base_urls(base_override)
+    if override:
+        return override[:_MAX_BASE_URLS]
+    if spec.get('openapi') is not None:
+        if opts.get('fan_out_servers') and opts['use_spec_servers']:
+            urls = _oas3_server_urls(spec)
+            if urls:
+                return urls
+        # the first server is used even when spec servers are off
+        return [_choose_base_from_oas3(spec)]
+    if spec.get('swagger') is not None and opts['use_spec_servers']:
+        return [_choose_base_from_swagger2(spec)]
+    return [None]
+
+
+class _BaseBinding(object):
+    # A base URL parsed once per spec. Operations are compiled without a base
+    # and placed on each binding with path_with_query(), so ten bases cost one
+    # generation pass plus ten string joins per operation.
+    def __init__(self, base, use_https):
+        self.base = base
+        self.host = None
+        self.error = None
+        if not base or not (base.startswith('http://') or base.startswith('https://')):
+            return
+        try:
+            u = urlparse(base)
+            port = u.port
+            self.use_https = bool(use_https)
+            if port is None:
+                port = 443 if self.use_https else 80
+            self.port = int(port)
+            self.prefix = (u.path or '').rstrip('/')
+            self.query = u.query or ''
+            host = u.hostname
+        except Exception as e:
+            self.error = e
+            return
+        if not host:
+            return
+        self.host = host
+        self.host_header = host
+        if (self.use_https and self.port != 443) or ((not self.use_https) and self.port != 80):
+            self.host_header = '%s:%d' % (host, self.port)
+        self.target = ('https' if self.use_https else 'http') + '://' + self.host_header
+
+    def path_with_query(self, path, query):
+        full = self.prefix + '/' + (path or '').lstrip('/')
+        gen_q = query[1:] if (query and query.startswith('?')) else (query or '')
+        if self.query and gen_q:
+            q = self.query + '&' + gen_q
+        else:
+            q = self.query or gen_q
+        return full + (('?' + q) if q else '')
+
+
+class _RefResolver(object):
+    # Resolves "#/..." references for one spec. Component sections
+    # (components/*, definitions, parameters, responses) are indexed once and
+    # every resolved reference is memoized, so a $ref used thousands of times
+    # is only looked up once. References to other documents are resolved
+    # against `base` (the spec's own URL) and read from `documents`
+    # (_ExternalDocs), which fetches each document on first use.
+    def __init__(self, spec, documents=None, base=None):
+        self._spec = spec
+        self._documents = documents
+        self._base = base
+        self._index = {}
+        self._memo = {}
+        comps = _safe_get(spec, 'components')
+        if _is_map(comps):
+            for kind, entries in comps.items():
+                self._index_section('#/components/' + _pointer_escape(kind), entries)
+        for section in ('definitions', 'parameters', 'responses'):
+            self._index_section('#/' + section, _safe_get(spec, section))
+
+    def _index_section(self, prefix, entries):
+        if not _is_map(entries):
+            return
+        for name, node in entries.items():
+            self._index[prefix + '/' + _pointer_escape(name)] = node
+
+    def _lookup(self, ref):
+        if ref in self._index:
+            return self._index[ref]
+        if ref.startswith('#'):
+            return _walk_pointer(self._spec, ref[1:])
+        url, _, pointer = ref.partition('#')
+        if self._base:
+            url = urljoin(self._base, url)
+        if url == self._base:
+            return self._lookup('#' + pointer)
+        if self._documents is None or not _looks_like_url(url):
+            return None
+        return _walk_pointer(self._documents.get(url), pointer)
+
+    def resolve(self, node):
+        # Follow a chain of $refs and return the target node. Unresolvable
+        # references and reference loops (a -> b -> a) resolve to None.
+        chain = []
+        while _is_ref(node):
+            ref = node['$ref']
+            if ref in self._memo:
+                node = self._memo[ref]
+                break
+            if ref in chain:
+                node = None
+                break
+            chain.append(ref)
+            node = self._lookup(ref)
+        for ref in chain:
+            self._memo[ref] = node
+        return node
+
+
+_MISSING = object()
+
+
+def _walk_pointer(doc, pointer):
+    # JSON pointer ("/a/b/0") into doc; "" is the whole document
+    if doc is None or (pointer and not pointer.startswith('/')):
+        return None
+    cur = doc
+    for part in pointer.split('/')[1:]:
+        part = _pointer_unescape(part)
+        if isinstance(cur, _LazyJsonObject):
+            # streamed `paths`: decode just the member the pointer names
+            cur = cur.get(part, _MISSING)
+            if cur is _MISSING:
+                return None
+        elif _is_map(cur) and part in cur:
+            cur = cur[part]
+        elif _is_seq(cur) and part.isdigit() and int(part) < len(cur):
+            cur = cur[int(part)]
+        else:
+            return None
+    return cur
 
 
-def _sample_value(schema):
-    if not isinstance(schema, dict):
-        return None
-    # honor explicit example/default first
-    if 'example' in schema:
-        return schema['example']
-    if 'default' in schema:
-        return schema['default']
-    t = schema.get('type')
-    if t == 'string' or t is None:
-        fmt = schema.get('format')
-        if fmt == 'date-time':
-            return '2025-01-01T00:00:00Z'
-        if fmt == 'date':
-            return '2025-01-01'
-        if fmt == 'uuid':
-            return '00000000-0000-0000-0000-000000000000'
-        return 'string'
-    if t == 'integer' or t == 'number':
-        return 0
-    if t == 'boolean':
-        return False
-    if t == 'array':
-        item_schema = schema.get('items') or {}
-        return [_sample_value(item_schema)]
-    if t == 'object':
-        props = schema.get('properties') or {}
-        required = schema.get('required') or []
-        obj = {}
-        for name, sub in props.items():
-            obj[name] = _sample_value(sub)
-        # ensure required keys exist
-        for r in required:
-            if r not in obj:
-                obj[r] = 'string'
-        return obj
+_JSON_EXTERNAL_REF = re.compile(r'"\$ref"\s*:\s*("(?!#)[^"\\]*(?:\\.[^"\\]*)*")')
+_YAML_EXTERNAL_REF = re.compile(r'''["']?\$ref["']?\s*:\s*["']?([^"'\s#,{}\[\]][^"'\s,{}\[\]]*)''')
+
+
+def _external_ref_hints(fmt, text):
+    # External $ref values found by scanning the raw document text, which is
+    # far cheaper than walking the parsed tree. Only used to decide what to
+    # prefetch; anything missed is still fetched when it is resolved.
+    if fmt == 'json':
+        refs = set()
+        for m in _JSON_EXTERNAL_REF.finditer(text):
+            try:
+                refs.add(json.loads(m.group(1)))
+            except ValueError:
+                pass
+        return refs
+    return set(_YAML_EXTERNAL_REF.findall(text))
+
+
+def _external_refs(doc):
+    # External $ref values found by walking a parsed document
+    refs = set()
+    stack = [doc]
+    while stack:
+        node = stack.pop()
+        if _is_map(node) or isinstance(node, _LazyJsonObject):
+            ref = node.get('$ref')
+            if isinstance(ref, _string_types):
+                if not ref.startswith('#'):
+                    refs.add(ref)
+                continue
+            stack.extend(v for _, v in node.items())
+        elif _is_seq(node):
+            stack.extend(node)
+    return refs
+
+
+def _absolutize_refs(doc, url):
+    # Rewrite every $ref in an external document relative to its own URL, so
+    # its "#/X" can't be mistaken for the root spec's "#/X". Returns the
+    # (plain Python) document and the external documents it references.
+    doc = _to_py(doc) if isinstance(doc, (_JavaMapView, _JavaListView)) else doc
+    targets = set()
+    stack = [doc]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, _string_types):
+                ref = node['$ref'] = urljoin(url, ref)
+                targets.add(ref.split('#', 1)[0])
+            else:
+                stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    targets.discard(url)
+    return doc, targets
+
+
+class _ExternalDocs(object):
+    # Documents named by external $refs ("schemas/user.yaml#/User" or an
+    # absolute URL), shared by all sources of one import. Each document is
+    # loaded once, even when several threads ask for it at the same time;
+    # a failed load is remembered as None. `load(url)` returns the parsed
+    # document. The document graph may contain cycles: every URL is loaded
+    # at most once, and at most _MAX_EXTERNAL_DOCS are loaded in total.
+    def __init__(self, load):
+        self._load = load
+        self._docs = {}
+        self._links = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, url):
+        with self._lock:
+            if url in self._docs:
+                return self._docs[url]
+            waiter = self._pending.get(url)
+            owner = waiter is None
+            if owner:
+                if len(self._docs) + len(self._pending) >= _MAX_EXTERNAL_DOCS:
+                    return None
+                waiter = self._pending[url] = threading.Event()
+        if not owner:
+            waiter.wait()
+            return self._docs.get(url)
+        doc, links = None, ()
+        try:
+            doc, links = _absolutize_refs(self._load(url), url)
+        except Exception:
+            pass
+        with self._lock:
+            self._docs[url] = doc
+            self._links[url] = links
+            del self._pending[url]
+        waiter.set()
+        return doc
+
+    def prefetch(self, base, refs, concurrency, cancel=None):
+        # Load the documents behind `refs` (relative to `base`) and,
+        # breadth first, everything they reference, `concurrency` at a time.
+        wave = set()
+        for ref in refs:
+            url = urljoin(base, ref.split('#', 1)[0]) if base else ref.split('#', 1)[0]
+            if url != base and _looks_like_url(url):
+                wave.add(url)
+        seen = set(wave)
+        seen.add(base)
+        while wave:
+            found = set()
+            for url, _, _ in _iter_parallel(self.get, sorted(wave), concurrency, cancel):
+                found.update(self._links.get(url) or ())
+            wave = found - seen
+            seen.update(wave)
+            if cancel is not None and cancel.is_set():
+                break
+
+
+def _pointer_escape(name):
+    return str(name).replace('~', '~0').replace('/', '~1')
+
+
+def _pointer_unescape(part):
+    return unquote(part).replace('~1', '/').replace('~0', '~')
+
+
+def _is_ref(node):
+    return _is_map(node) and isinstance(node.get('$ref'), _string_types)
+
+
+def _sample_value(schema, resolver=None, memo=None):
+    # Example value for a schema. `memo` ({ref: (value, nodes)}) shares the
+    # samples of $ref targets between calls; see _Sampler.
+    return _Sampler(resolver, memo).sample(schema)
+
+
+def _sample_stub(schema):
+    # placeholder for a branch that is not expanded
+    if _is_map(schema):
+        if schema.get('type') == 'array':
+            return []
+        if schema.get('type') == 'object' or _is_map(schema.get('properties')):
+            return {}
     return None
 
 
-def _param_example(p):
-    if not isinstance(p, dict):
+class _Sampler(object):
+    # Builds one sample value. Each $ref target is sampled once and shared
+    # through `memo`, so densely linked components (User <-> Org <-> Team)
+    # cost one expansion each instead of one per path through the graph. A
+    # $ref re-entered while it is being expanded, a branch nested deeper
+    # than _SAMPLE_MAX_DEPTH and everything past _SAMPLE_MAX_NODES become
+    # stubs. Samples cut short by the depth or node cap depend on where they
+    # were reached and are not memoized.
+    def __init__(self, resolver, memo=None):
+        self._resolver = resolver
+        self._memo = memo if memo is not None else {}
+        self._active = set()
+        self._nodes = 0
+        self._cuts = 0
+
+    def sample(self, schema):
+        return self._sample(schema, 0)
+
+    def _sample(self, schema, depth):
+        if self._resolver is not None and _is_ref(schema):
+            return self._sample_ref(schema, depth)
+        if not _is_map(schema):
+            return None
+        if depth >= _SAMPLE_MAX_DEPTH or self._nodes >= _SAMPLE_MAX_NODES:
+            self._cuts += 1
+            return _sample_stub(schema)
+        self._nodes += 1
+        # honor explicit example/default first
+        if 'example' in schema:
+            return schema['example']
+        if 'default' in schema:
+            return schema['default']
+        if _is_seq(schema.get('allOf')):
+            merged = {}
+            for sub in schema['allOf']:
+                v = self._sample(sub, depth)
+                if _is_map(v):
+                    merged.update(v)
+            return merged
+        for key in ('oneOf', 'anyOf'):
+            if _is_seq(schema.get(key)) and schema[key]:
+                return self._sample(schema[key][0], depth)
+        t = schema.get('type')
+        if t == 'string' or t is None:
+            fmt = schema.get('format')
+            if fmt == 'date-time':
+                return '2025-01-01T00:00:00Z'
+            if fmt == 'date':
+                return '2025-01-01'
+            if fmt == 'uuid':
+                return '00000000-0000-0000-0000-000000000000'
+            if t is None and _is_map(schema.get('properties')):
+                t = 'object'
+            else:
+                return 'string'
+        if t == 'integer' or t == 'number':
+            return 0
+        if t == 'boolean':
+            return False
+        if t == 'array':
+            item = self._sample(schema.get('items') or {}, depth + 1)
+            return [] if item is None else [item]
+        if t == 'object':
+            props = schema.get('properties') or {}
+            required = schema.get('required') or []
+            obj = {}
+            for name, sub in props.items():
+                if self._nodes >= _SAMPLE_MAX_NODES:
+                    self._cuts += 1
+                    break
+                obj[name] = self._sample(sub, depth + 1)
+            # ensure required keys exist
+            for r in required:
+                if r not in obj:
+                    obj[r] = 'string'
+            return obj
+        return None
+
+    def _sample_ref(self, node, depth):
+        ref = node['$ref']
+        hit = self._memo.get(ref)
+        if hit is not None and self._nodes + hit[1] <= _SAMPLE_MAX_NODES:
+            self._nodes += hit[1]
+            return hit[0]
+        target = self._resolver.resolve(node)
+        if hit is not None or ref in self._active:
+            if hit is not None:
+                self._cuts += 1
+            self._nodes += 1
+            return _sample_stub(target)
+        self._active.add(ref)
+        nodes, cuts = self._nodes, self._cuts
+        try:
+            value = self._sample(target, depth)
+        finally:
+            self._active.discard(ref)
+        if self._cuts == cuts:
+            self._memo[ref] = (value, self._nodes - nodes)
+        return value
+
+
+def _param_example(p, resolver=None):
+    if resolver is not None:
+        p = resolver.resolve(p)
+    if not _is_map(p):
         return 'string'
     if 'example' in p:
         v = p['example']
@@ -306,7 +1116,10 @@ def _param_example(p):
     if 'default' in p:
         v = p['default']
         return v
-    t = p.get('type') or (p.get('schema') or {}).get('type')
+    schema = p.get('schema') or {}
+    if resolver is not None:
+        schema = resolver.resolve(schema) or {}
+    t = p.get('type') or schema.get('type')
     if t in ('integer', 'number'):
         return 123
     if t == 'boolean':
@@ -314,53 +1127,1265 @@ def _param_example(p):
     return 'string'
 
 
+_OMIT = object()
+
+
+def _field_schema(p, resolver):
+    # Schema of a parameter: OAS3 and Swagger 2.0 body parameters nest it
+    # under `schema`, other Swagger 2.0 parameters carry type/enum/minimum
+    # on the parameter itself.
+    p = resolver.resolve(p) if resolver is not None else p
+    if not _is_map(p):
+        return {}
+    schema = p.get('schema')
+    if schema is None:
+        return p
+    schema = resolver.resolve(schema) if resolver is not None else schema
+    return schema if _is_map(schema) else {}
+
+
+def _value_mutations(schema, required, resolver=None):
+    # Lazily yield (description, value) boundary and negative values for one
+    # field: enum members, minimum/maximum and length limits with their
+    # off-by-one neighbours, empty, oversized, wrong type and null. Optional
+    # fields are also omitted (value _OMIT).
+    if resolver is not None:
+        schema = resolver.resolve(schema)
+    if not _is_map(schema):
+        schema = {}
+    t = schema.get('type')
+    if t is None and _is_map(schema.get('properties')):
+        t = 'object'
+    enum = schema.get('enum')
+    if _is_seq(enum):
+        for v in enum:
+            yield 'enum %s' % json.dumps(v, default=_json_default)[:40], v
+    if t in ('integer', 'number'):
+        for key, label in (('minimum', 'min'), ('maximum', 'max')):
+            limit = schema.get(key)
+            if isinstance(limit, (int, float)) and not isinstance(limit, bool):
+                yield label, limit
+                yield label + ('-1' if key == 'minimum' else '+1'), limit + (-1 if key == 'minimum' else 1)
+        yield 'zero', 0
+        yield 'negative', -1
+        yield 'oversized', 2 ** 63
+        if t == 'integer':
+            yield 'fraction', 1.5
+        yield 'wrong type', 'abc'
+    elif t == 'boolean':
+        yield 'wrong type', 'notabool'
+    elif t == 'array':
+        item = _sample_value(schema.get('items') or {}, resolver)
+        for key, label in (('minItems', 'minItems'), ('maxItems', 'maxItems')):
+            limit = schema.get(key)
+            if isinstance(limit, int) and not isinstance(limit, bool) and 0 <= limit <= _OVERSIZED_ITEMS:
+                yield label, [item] * limit
+        yield 'empty', []
+        yield 'oversized', [item] * _OVERSIZED_ITEMS
+        yield 'wrong type', 'string'
+    elif t == 'object':
+        yield 'empty', {}
+        yield 'wrong type', 'string'
+    else:
+        for key, label, delta in (('minLength', 'minLength-1', -1), ('maxLength', 'maxLength', 0),
+                                  ('maxLength', 'maxLength+1', 1)):
+            limit = schema.get(key)
+            if isinstance(limit, int) and not isinstance(limit, bool) and 0 <= limit + delta <= _OVERSIZED_CHARS:
+                yield label, 'a' * (limit + delta)
+        if schema.get('format') in ('date', 'date-time', 'uuid', 'email', 'uri'):
+            yield 'bad format', 'not-a-' + schema['format']
+        yield 'empty', ''
+        yield 'oversized', 'A' * _OVERSIZED_CHARS
+        yield 'wrong type', 12345
+    yield 'null', None
+    if not required:
+        yield 'omitted', _OMIT
+
+
+def _round_robin(generators):
+    # one value from each generator in turn until all are exhausted
+    generators = list(generators)
+    while generators:
+        for gen in list(generators):
+            try:
+                yield next(gen)
+            except StopIteration:
+                generators.remove(gen)
+
+
+def _variant_rng(seed, op_key):
+    # per-operation stream, so a variant does not depend on the operations before it
+    return random.Random((int(seed) * 1000003) ^ (zlib.crc32(_encode_utf8(op_key)) & 0xffffffff))
+
+
+def _param_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def _operation_variants(op_key, seed, params_index, body_schema, body_value, body_required, resolver,
+                        include_query=True, fill_path=True):
+    # Lazily yield (label, location, name, value) for one operation, each
+    # changing a single field: a path or query parameter, one top-level
+    # property of the body (name set) or the whole body (name None). Fields
+    # take turns in a seeded order, so a small cap still spreads over all of
+    # them and the same seed reproduces the same variants.
+    fields = []
+    if fill_path:
+        for name, p in (params_index.get('path') or {}).items():
+            fields.append(('path', name, _value_mutations(_field_schema(p, resolver), True, resolver)))
+    if include_query:
+        for name, p in (params_index.get('query') or {}).items():
+            fields.append(('query', name, _value_mutations(_field_schema(p, resolver), bool(p.get('required')),
+                                                           resolver)))
+    if body_schema is not None:
+        schema = resolver.resolve(body_schema)
+        if _is_map(schema) and _is_map(schema.get('properties')) and _is_map(body_value):
+            required = schema.get('required') or []
+            for name, sub in schema['properties'].items():
+                fields.append(('body', name, _value_mutations(sub, name in required, resolver)))
+        fields.append(('body', None, _value_mutations(schema, bool(body_required), resolver)))
+    _variant_rng(seed, op_key).shuffle(fields)
+
+    def _labelled(loc, name, mutations):
+        prefix = loc if name is None else '%s.%s' % (loc, name)
+        if loc == 'body':
+            baseline = body_value if name is None else body_value.get(name)
+        else:
+            baseline = _param_example(params_index[loc][name], resolver)
+        for desc, value in mutations:
+            # a "mutation" equal to the base request adds nothing
+            if value is not _OMIT and type(value) is type(baseline) and value == baseline:
+                continue
+            yield '%s: %s' % (prefix, desc), loc, name, value
+    return _round_robin(_labelled(loc, name, mutations) for loc, name, mutations in fields)
+
+
+def _json_default(obj):
+    # json.dumps hook for lazy YAML views and leftover Java values (dates, ...)
+    if isinstance(obj, (_JavaMapView, _JavaListView)):
+        return _to_py(obj)
+    return str(obj)
+
+
+def _body_text(body):
+    if body is None:
+        return None
+    if isinstance(body, (dict, list)):
+        return json.dumps(body, default=_json_default)
+    if _is_map(body) or _is_seq(body):
+        return json.dumps(_to_py(body), default=_json_default)
+    return str(body)
+
+
+class _SampleCache(object):
+    # Per-spec memo of generated request bodies. The same DTO typically backs
+    # dozens of operations, so its sample is generated and serialized once;
+    # callers share the serialized text or get a private copy of the value.
+    def __init__(self, resolver):
+        self._resolver = resolver
+        self._values = {}
+        self._texts = {}
+        # samples of $ref targets, shared by every body of the spec
+        self._refs = {}
+
+    def _key(self, node):
+        # a $ref is keyed by its target so every use site shares one entry
+        if _is_ref(node):
+            return ('ref', node['$ref'])
+        return ('id', id(node))
+
+    def _sample(self, schema):
+        key = self._key(schema)
+        hit = self._values.get(key)
+        if hit is None:
+            # keep the node alive so its id() cannot be reused
+            hit = (schema, _sample_value(schema, self._resolver, self._refs))
+            self._values[key] = hit
+        return hit[1]
+
+    def value(self, schema):
+        return copy.deepcopy(self._sample(schema))
+
+    def body_text(self, schema):
+        key = self._key(schema)
+        hit = self._texts.get(key)
+        if hit is None:
+            hit = (schema, _body_text(self._sample(schema)))
+            self._texts[key] = hit
+        return hit[1]
+
+    def example_text(self, example):
+        # explicit examples are spec nodes too; serialize each one once
+        key = ('example', id(example))
+        hit = self._texts.get(key)
+        if hit is None:
+            hit = (example, _body_text(example))
+            self._texts[key] = hit
+        return hit[1]
+
+
+class _Fingerprinter(object):
+    # Digests of spec nodes for incremental re-import. A $ref contributes the
+    # digest of its target, computed once per reference, so editing a shared
+    # component changes the fingerprint of every operation that uses it.
+    def __init__(self, resolver):
+        self._resolver = resolver
+        self._refs = {}
+
+    def digest(self, *nodes):
+        h = hashlib.sha1()
+        for node in nodes:
+            self._feed(h, node, ())
+        return h.hexdigest()
+
+    def _ref_digest(self, ref, node, stack):
+        d = self._refs.get(ref)
+        if d is None:
+            if ref in stack:
+                return _encode_utf8(u'cycle:' + ref)
+            sub = hashlib.sha1()
+            self._feed(sub, self._resolver.resolve(node), stack + (ref,))
+            d = self._refs[ref] = sub.digest()
+        return d
+
+    def _feed(self, h, node, stack):
+        if _is_ref(node):
+            h.update(b'$')
+            h.update(self._ref_digest(node['$ref'], node, stack))
+        elif _is_map(node):
+            h.update(b'{')
+            for k, v in node.items():
+                self._feed(h, k, stack)
+                self._feed(h, v, stack)
+            h.update(b'}')
+        elif _is_seq(node):
+            h.update(b'[')
+            for v in node:
+                self._feed(h, v, stack)
+            h.update(b']')
+        elif isinstance(node, _string_types):
+            h.update(b's')
+            h.update(_encode_utf8(node))
+            h.update(b'\x00')
+        else:
+            # numbers, booleans, null and leftover Java values
+            h.update(_encode_utf8(u'%s:%r\x00' % (type(node).__name__, node)))
+
+
+def _index_params(params, resolver, base=None):
+    # {location: OrderedDict(name -> param)} with $refs resolved. Entries
+    # from `params` override those of `base` (path-level parameters) that
+    # share the same location and name, as OpenAPI specifies.
+    index = {}
+    if base:
+        for loc, named in base.items():
+            index[loc] = OrderedDict(named)
+    if not _is_seq(params):
+        return index
+    for p in params:
+        p = resolver.resolve(p)
+        if not _is_map(p):
+            continue
+        index.setdefault(p.get('in'), OrderedDict())[p.get('name')] = p
+    return index
+
+
+def _compile_path_template(raw_path):
+    # '/a/{id}/b' -> ['/a/', 'id', '/b']: literals at even, names at odd indexes
+    return re.split(r"\{([^}]+)\}", raw_path)
+
+
+def _render_path_template(template, path_params, resolver, overrides=None):
+    if len(template) == 1:
+        return template[0]
+    parts = []
+    for i, part in enumerate(template):
+        if i % 2 == 0:
+            parts.append(part)
+            continue
+        p = path_params.get(part) if path_params else None
+        if overrides and part in overrides:
+            replacement = _quote(_encode_utf8(u'%s' % _param_text(overrides[part])), safe='')
+        else:
+            replacement = _param_example(p, resolver) if p is not None else None
+        if replacement is None:
+            replacement = '123'
+        parts.append(str(replacement))
+    return ''.join(parts)
+
+
 def _build_query(params):
     # params: list of (name, value)
     if not params:
         return ''
     enc = []
     for k, v in params:
-        try:
-            from urllib import quote as _quote
-        except Exception:
-            from urllib.parse import quote as _quote
         enc.append('%s=%s' % (_quote(str(k)), _quote(str(v))))
     return '?' + '&'.join(enc)
 
 
-def _build_http_request(method, path_with_query, host_header, headers_list, body, helpers):
-    lines = []
-    lines.append('%s %s HTTP/1.1' % (method.upper(), path_with_query or '/'))
-    if host_header:
-        lines.append('Host: %s' % host_header)
-    # default Accept
-    has_accept = any(h[0].lower() == 'accept' for h in headers_list)
-    if not has_accept:
-        headers_list = headers_list + [('Accept', 'application/json')]
-    for name, val in headers_list:
-        if name.lower() == 'host':
+def _to_byte_array(data):
+    # byte string -> array('b'), which Jython hands to Java as byte[]
+    arr = array('b')
+    try:
+        arr.frombytes(data)
+    except AttributeError:
+        arr.fromstring(data)
+    return arr
+
+
+def _array_bytes(arr):
+    try:
+        return arr.tobytes()
+    except AttributeError:
+        return arr.tostring()
+
+
+class _RequestSerializer(object):
+    # Byte-level request builder for one import. The header block shared by
+    # every request (Authorization, custom headers, default Accept) is encoded
+    # once; each request is then its request line, Host and Content-Type
+    # followed by that block and the body, joined as bytes.
+    def __init__(self, headers_list):
+        self.headers = list(headers_list)
+        lines = []
+        has_accept = False
+        for name, val in self.headers:
+            if name.lower() == 'host':
+                continue
+            if name.lower() == 'accept':
+                has_accept = True
+            lines.append('%s: %s\r\n' % (name, val))
+        # default Accept
+        if not has_accept:
+            lines.append('Accept: application/json\r\n')
+        self._block = _encode_utf8(''.join(lines) + '\r\n')
+        self._bodies = {}
+
+    def _body_bytes(self, body):
+        # bodies are shared across operations; encode each distinct one once
+        hit = self._bodies.get(id(body))
+        if hit is None:
+            hit = (body, _encode_utf8(_body_text(body)))
+            self._bodies[id(body)] = hit
+        return hit[1]
+
+    def build(self, method, path_with_query, host_header, content_type, body, shared_body=True):
+        # `shared_body` False skips the body cache, for one-off bodies (variants)
+        head = '%s %s HTTP/1.1\r\n' % (method.upper(), path_with_query or '/')
+        if host_header:
+            head += 'Host: %s\r\n' % host_header
+        if content_type:
+            head += 'Content-Type: %s\r\n' % content_type
+        parts = [_encode_utf8(head), self._block]
+        if body is not None:
+            parts.append(self._body_bytes(body) if shared_body else _encode_utf8(_body_text(body)))
+        return _to_byte_array(_EMPTY_BYTES.join(parts))
+
+
+def _build_http_request(method, path_with_query, host_header, headers_list, body):
+    return _RequestSerializer(headers_list).build(method, path_with_query, host_header, None, body)
+
+
+def _header_value(header_lines, name):
+    # Value of the first "Name: value" line matching `name` (case-insensitive).
+    prefix = name.lower() + ':'
+    for h in header_lines or []:
+        try:
+            if h.lower().startswith(prefix):
+                return h.split(':', 1)[1].strip()
+        except Exception:
             continue
-        lines.append('%s: %s' % (name, val))
-    req = '\r\n'.join(lines) + '\r\n\r\n'
-    if body is not None:
-        if isinstance(body, (dict, list)):
-            body_text = json.dumps(body)
+    return None
+
+
+class _SpecCache(object):
+    # LRU of parsed specs keyed by URL + fetch headers, bounded by the total
+    # size of the response bodies they were parsed from. Entries keep the
+    # ETag/Last-Modified validators so repeat imports can revalidate with a
+    # conditional GET and skip both transfer and parsing on 304.
+    def __init__(self, max_bytes=_SPEC_CACHE_MAX_BYTES, max_entries=_SPEC_CACHE_MAX_ENTRIES):
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url, headers):
+        return url + '\n' + '\n'.join('%s: %s' % (k, v) for k, v in sorted((headers or {}).items()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def put(self, key, spec, size, etag=None, last_modified=None, origin=None):
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old['size']
+            self._entries[key] = {'spec': spec, 'size': size, 'etag': etag, 'last_modified': last_modified,
+                                  'origin': dict(origin or {})}
+            self._size += size
+            while self._entries and (self._size > self._max_bytes or len(self._entries) > self._max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted['size']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_INTERNED = {}
+
+
+def _intern(text):
+    # One shared instance per distinct value, for the low-cardinality
+    # strings repeated on every item (method, host, target, tag, ...).
+    # Unlike intern() this also works for unicode under Python 2/Jython.
+    if text is None:
+        return None
+    return _INTERNED.setdefault(text, text)
+
+
+class _PreparedItem(object):
+    # One prepared request. Large imports hold tens of thousands of these, so
+    # they are slotted rather than dicts, repeated strings are interned and
+    # the table label is derived when asked for. Items keep the mapping-style
+    # access (item['path'], item.get('tag')) used throughout the extension.
+    __slots__ = ('method', 'path', 'target', 'tag', 'host', 'port', 'use_https', 'host_header', 'content_type',
+                 'serializer', 'body', 'req_bytes', 'caption', 'operation_id', 'op_key', 'fp', 'status', 'source')
+
+    def __init__(self, method, path, target, host, port, use_https, host_header, serializer, body=None,
+                 content_type=None, caption=None, tag=None, operation_id=None, op_key=None, fp=None, status='',
+                 source=None):
+        self.method = _intern(method)
+        self.path = path
+        self.target = _intern(target)
+        self.tag = _intern(tag)
+        self.host = _intern(host)
+        self.port = port
+        self.use_https = use_https
+        self.host_header = _intern(host_header)
+        self.content_type = _intern(content_type)
+        self.serializer = serializer
+        self.body = body
+        # raw bytes are built on first send/view (_item_request_bytes)
+        self.req_bytes = None
+        self.caption = caption
+        self.operation_id = operation_id
+        self.op_key = op_key
+        self.fp = fp
+        self.status = status
+        self.source = _intern(source)
+
+    @property
+    def label(self):
+        return '%s %s  ->  %s' % (self.method, self.path, self.target)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+def _item_request_bytes(info):
+    # Build the raw request of a prepared item on first use and keep it.
+    req = info.get('req_bytes')
+    if req is None:
+        req = info['serializer'].build(info['method'], info['path'], info['host_header'],
+                                       info.get('content_type'), info['body'])
+        info['req_bytes'] = req
+    return req
+
+
+def _spec_fetch_headers(jwt, custom_headers):
+    # headers used to retrieve specs: the JWT as a Bearer token plus the
+    # custom headers, where an explicit Authorization loses to the JWT
+    headers = {}
+    if jwt:
+        headers['Authorization'] = 'Bearer ' + jwt
+    for name, val in custom_headers:
+        if name.lower() == 'authorization' and 'Authorization' in headers:
+            continue
+        headers[name] = val
+    return headers
+
+
+def _parse_int(text, default, minimum=1):
+    try:
+        v = int(_strip(text))
+    except Exception:
+        return default
+    return max(minimum, v)
+
+
+def _encode_utf8(text):
+    try:
+        return text.encode('utf-8')
+    except Exception:
+        # already a byte string (Jython/Python 2 str with non-ASCII bytes)
+        return text
+
+
+class _LogSink(object):
+    # Thread-safe log buffer. Records are kept in a capped ring buffer; lines
+    # at or above the display level queue up until the UI drains them, and
+    # every record is optionally appended to a file.
+    def __init__(self, capacity=_LOG_CAPACITY):
+        self._records = deque(maxlen=capacity)
+        self._pending = []
+        self._level = _INFO
+        self._file = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _format(record):
+        ts, level, msg = record
+        name = _LOG_LEVEL_NAMES[max(0, min(3, level // 10 - 1))]
+        return '%s %-5s %s' % (time.strftime('%H:%M:%S', time.localtime(ts)), name, msg)
+
+    def emit(self, level, msg):
+        record = (time.time(), level, msg)
+        with self._lock:
+            self._records.append(record)
+            if level >= self._level:
+                self._pending.append(record)
+                if len(self._pending) > _LOG_MAX_UI_LINES:
+                    del self._pending[:-_LOG_MAX_UI_LINES]
+            if self._file is not None:
+                try:
+                    self._file.write(_encode_utf8(self._format(record) + '\n'))
+                except Exception:
+                    self._file = None
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                except Exception:
+                    pass
+        return [self._format(r) for r in pending]
+
+    def set_level(self, level):
+        # switch the display level and return the retained lines it shows
+        with self._lock:
+            self._level = level
+            self._pending = []
+            records = [r for r in self._records if r[1] >= level]
+        return [self._format(r) for r in records]
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._pending = []
+
+    def has_file(self):
+        return self._file is not None
+
+    def open_file(self, path):
+        # write what is retained so far, then append every new record
+        f = open(path, 'ab')
+        with self._lock:
+            for r in self._records:
+                f.write(_encode_utf8(self._format(r) + '\n'))
+            f.flush()
+            self._file = f
+
+    def close_file(self):
+        with self._lock:
+            f, self._file = self._file, None
+        if f is not None:
+            try:
+                f.close()
+            except Exception:
+                pass
+
+
+class _HostLimiter(object):
+    # Caps concurrent connections per host:port across all fetch threads.
+    def __init__(self, per_host):
+        self._per_host = max(1, int(per_host))
+        self._lock = threading.Lock()
+        self._sems = {}
+
+    def _sem(self, key):
+        with self._lock:
+            sem = self._sems.get(key)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self._per_host)
+                self._sems[key] = sem
+            return sem
+
+    def acquire(self, host, port):
+        sem = self._sem('%s:%s' % (host, port))
+        sem.acquire()
+        return sem
+
+
+def _iter_parallel(func, items, concurrency, cancel=None):
+    # Run func(item) on up to `concurrency` daemon threads and yield
+    # (item, result, error) tuples in the same order as `items`. Once
+    # `cancel` (a threading.Event) is set, no new items are started; calls
+    # in flight get _CANCEL_GRACE_SECONDS to return what they have (e.g. a
+    # partial generation) and are abandoned after that.
+    items = list(items)
+    if (concurrency <= 1 or len(items) <= 1) and cancel is None:
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    cond = threading.Condition()
+    results = {}
+    state = {'next': 0}
+
+    def run():
+        while True:
+            with cond:
+                i = state['next']
+                if i >= len(items) or (cancel is not None and cancel.is_set()):
+                    return
+                state['next'] = i + 1
+            try:
+                res = (func(items[i]), None)
+            except Exception as e:
+                res = (None, e)
+            with cond:
+                results[i] = res
+                cond.notify_all()
+
+    for _ in range(max(1, min(concurrency, len(items)))):
+        thr = threading.Thread(target=run)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+
+    deadline = None
+    for i in range(len(items)):
+        with cond:
+            while i not in results:
+                if cancel is not None and cancel.is_set():
+                    if i >= state['next']:
+                        break  # never started
+                    if deadline is None:
+                        deadline = time.time() + _CANCEL_GRACE_SECONDS
+                    if time.time() >= deadline:
+                        break
+                # poll so a cancel is noticed while a call is still running
+                cond.wait(0.2 if cancel is not None else None)
+            if i not in results:
+                continue
+            res, err = results.pop(i)
+        yield items[i], res, err
+
+
+class _TrigramIndex(object):
+    # Lower-cased strings indexed by their 3-grams. A substring or glob query
+    # only verifies the rows in the shortest posting list of its literals.
+    def __init__(self, texts):
+        self._texts = [(t or '').lower() for t in texts]
+        grams = {}
+        for row, text in enumerate(self._texts):
+            for gram in set(text[i:i + 3] for i in range(len(text) - 2)):
+                grams.setdefault(gram, []).append(row)
+        self._grams = grams
+
+    def _candidates(self, literals):
+        # shortest posting list over every trigram of every literal;
+        # None when no literal is long enough to use the index
+        best = None
+        for lit in literals:
+            for i in range(len(lit) - 2):
+                rows = self._grams.get(lit[i:i + 3])
+                if rows is None:
+                    return []
+                if best is None or len(rows) < len(best):
+                    best = rows
+        return best
+
+    def search(self, term):
+        term = term.lower()
+        texts = self._texts
+        if '*' in term or '?' in term:
+            literals = [lit for lit in re.split(r"[*?]+", term) if lit]
+            rx = re.compile('.*?'.join('.'.join(re.escape(p) for p in part.split('?'))
+                                       for part in term.split('*')))
+            match = lambda text: rx.search(text) is not None
+        else:
+            literals = [term]
+            match = lambda text: term in text
+        rows = self._candidates(literals)
+        if rows is None:
+            rows = range(len(texts))
+        return set(row for row in rows if match(texts[row]))
+
+
+class _ItemIndex(object):
+    # Filter index over prepared items, built once per import off the UI
+    # thread. Methods, tags and hosts have few distinct values, so they map
+    # to row lists; paths and operationIds use trigram indexes.
+    FILTER_HELP = ('Filter: words match the path (substring, or glob with * and ?); '
+                   'also method:get,post  tag:users  op:getUser  host:api.example.com  has:body')
+
+    def __init__(self, items):
+        self.size = len(items)
+        self._methods = {}
+        self._tags = {}
+        self._hosts = {}
+        self._with_body = set()
+        for row, info in enumerate(items):
+            self._methods.setdefault((info.get('method') or '').lower(), []).append(row)
+            self._tags.setdefault((info.get('tag') or '').lower(), []).append(row)
+            self._hosts.setdefault((info.get('host') or '').lower(), []).append(row)
+            if info.get('body') is not None:
+                self._with_body.add(row)
+        self._paths = _TrigramIndex([info.get('path') for info in items])
+        self._op_ids = _TrigramIndex([info.get('operation_id') for info in items])
+
+    @staticmethod
+    def _keyed(table, term, exact=False):
+        term = term.lower()
+        rows = set()
+        for key, key_rows in table.items():
+            if (key == term) if exact else (term in key):
+                rows.update(key_rows)
+        return rows
+
+    def query(self, text):
+        # Sorted row indexes matching every term of `text`, or None when
+        # the filter is empty.
+        sets = []
+        for token in (text or '').split():
+            name, sep, value = token.partition(':')
+            name = name.lower()
+            if not sep or not value or name not in ('method', 'tag', 'op', 'host', 'has', 'path'):
+                sets.append(self._paths.search(token))
+            elif name == 'method':
+                rows = set()
+                for m in value.split(','):
+                    rows.update(self._keyed(self._methods, m, True))
+                sets.append(rows)
+            elif name == 'tag':
+                sets.append(self._keyed(self._tags, value))
+            elif name == 'host':
+                sets.append(self._keyed(self._hosts, value))
+            elif name == 'op':
+                sets.append(self._op_ids.search(value))
+            elif name == 'has':
+                sets.append(self._with_body if value.lower() == 'body' else set())
+            else:
+                sets.append(self._paths.search(value))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        rows = set(sets[0])
+        for other in sets[1:]:
+            if not rows:
+                break
+            rows &= other
+        return sorted(rows)
+
+
+class _RequestsTableModel(AbstractTableModel):
+    # Backing model for the Requests table. Selection state lives here (not
+    # in per-row components), so 'Select all' is a single list assignment.
+    # A filter maps visible rows to item indexes (`_view`); selection is
+    # kept per item, so hidden rows keep theirs.
+    COLUMNS = ['', 'Method', 'Path', 'Target', 'Tag', 'Change']
+    KEYS = [None, 'method', 'path', 'target', 'tag', 'status']
+    WIDTHS = [30, 70, 500, 250, 120, 70]
+
+    def __init__(self):
+        self._items = []
+        self._selected = []
+        self._index = None
+        self._view = None
+
+    def set_items(self, items, index=None):
+        self._items = list(items)
+        self._selected = [False] * len(self._items)
+        self._index = index
+        self._view = None
+        self.fireTableDataChanged()
+
+    def items(self):
+        return self._items
+
+    def item_at(self, row):
+        return self._items[self._view[row] if self._view is not None else row]
+
+    def selection(self):
+        return self._selected
+
+    def set_filter(self, text):
+        # Returns the number of visible rows.
+        if _strip(text):
+            if self._index is None or self._index.size != len(self._items):
+                self._index = _ItemIndex(self._items)
+            self._view = self._index.query(text)
+        else:
+            self._view = None
+        self.fireTableDataChanged()
+        return self.getRowCount()
+
+    def set_selected_rows(self, rows):
+        n = len(self._items)
+        for i in rows:
+            if 0 <= i < n:
+                self._selected[i] = True
+        if self.getRowCount():
+            self.fireTableRowsUpdated(0, self.getRowCount() - 1)
+
+    def set_all_selected(self, sel):
+        # applies to the rows matching the current filter
+        if self._view is None:
+            self._selected = [bool(sel)] * len(self._items)
         else:
-            body_text = str(body)
-        req += body_text
-    return helpers.stringToBytes(req)
+            sel = bool(sel)
+            for i in self._view:
+                self._selected[i] = sel
+        if self.getRowCount():
+            self.fireTableRowsUpdated(0, self.getRowCount() - 1)
+
+    def selected_items(self):
+        return [info for info, sel in zip(self._items, self._selected) if sel]
+
+    # AbstractTableModel
+    def getRowCount(self):
+        return len(self._view) if self._view is not None else len(self._items)
+
+    def getColumnCount(self):
+        return len(self.COLUMNS)
+
+    def getColumnName(self, col):
+        return self.COLUMNS[col]
+
+    def getColumnClass(self, col):
+        return Boolean if col == 0 else String
+
+    def isCellEditable(self, row, col):
+        return col == 0
+
+    def getValueAt(self, row, col):
+        i = self._view[row] if self._view is not None else row
+        if col == 0:
+            return self._selected[i]
+        return self._items[i].get(self.KEYS[col]) or ''
+
+    def setValueAt(self, value, row, col):
+        if col == 0:
+            i = self._view[row] if self._view is not None else row
+            self._selected[i] = bool(value)
+            self.fireTableCellUpdated(row, col)
+
+
+class _FilterListener(DocumentListener):
+    # Restarts the filter debounce timer on every edit of the filter field.
+    def __init__(self, timer):
+        self._timer = timer
+
+    def insertUpdate(self, event):
+        self._timer.restart()
+
+    def removeUpdate(self, event):
+        self._timer.restart()
+
+    def changedUpdate(self, event):
+        self._timer.restart()
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _ImportStats(object):
+    # Per-source phase timings and counters. Several threads may add to the
+    # same source (parallel discovery probes), so updates are locked.
+    FIELDS = ['fetch_ms', 'requests', 'bytes', 'parse_ms', 'generate_ms',
+              'operations', 'reused', 'skipped', 'bodies']
+
+    def __init__(self, source):
+        self.source = source
+        self.status = 'pending'
+        self._lock = threading.Lock()
+        self._values = dict((k, 0) for k in self.FIELDS)
+
+    def add(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def add_time(self, key, started):
+        self.add(key, int(round((time.time() - started) * 1000)))
+
+    def get(self, key):
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def as_dict(self):
+        with self._lock:
+            d = OrderedDict([('source', self.source), ('status', self.status)])
+            for k in self.FIELDS:
+                d[k] = self._values.get(k, 0)
+            return d
+
+
+class _StatsTableModel(AbstractTableModel):
+    # One row per source plus a totals row.
+    COLUMNS = ['Source', 'Status', 'Fetch ms', 'Requests', 'Bytes', 'Parse ms',
+               'Generate ms', 'Operations', 'Reused', 'Skipped', 'Bodies']
+    KEYS = ['source', 'status'] + _ImportStats.FIELDS
+
+    def __init__(self):
+        self._rows = []
+
+    def set_rows(self, rows):
+        self._rows = list(rows)
+        self.fireTableDataChanged()
+
+    def getRowCount(self):
+        return len(self._rows)
+
+    def getColumnCount(self):
+        return len(self.COLUMNS)
+
+    def getColumnName(self, col):
+        return self.COLUMNS[col]
+
+    def getValueAt(self, row, col):
+        value = self._rows[row].get(self.KEYS[col])
+        return '' if value is None else str(value)
+
+
+def _stats_report(stats, total_ms, populate_ms, shared=()):
+    # `shared` rows (documents fetched for several sources) are listed after
+    # the sources and count towards the totals
+    sources = [st.as_dict() for st in stats]
+    count = len(sources)
+    sources.extend(st.as_dict() for st in shared)
+    # per-source times add up across parallel workers; total_ms is wall clock
+    totals = OrderedDict([('source', 'Total (%d source(s))' % count), ('status', '')])
+    for k in _ImportStats.FIELDS:
+        totals[k] = sum(row[k] for row in sources)
+    return OrderedDict([('total_ms', total_ms), ('populate_ms', populate_ms),
+                        ('totals', totals), ('sources', sources)])
+
+
+class _ExportWriter(object):
+    # Base for the export formats. Items arrive one at a time from
+    # _process_spec; each is serialized and written before the next one is
+    # generated, so nothing accumulates in memory. Subclasses implement
+    # _write(info, request), where `request` is the byte array Burp takes;
+    # `count` is the number of items written before this one.
+    def __init__(self):
+        self.count = 0
+
+    def write(self, info):
+        self._write(info, _item_request_bytes(info))
+        self.count += 1
+
+    def _write(self, info, request):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _url(info):
+        return ('https' if info['use_https'] else 'http') + '://' + info['host_header'] + info['path']
+
+
+class _RawExportWriter(_ExportWriter):
+    # one raw HTTP request per .http file in a directory
+    def __init__(self, directory):
+        _ExportWriter.__init__(self)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._dir = directory
+
+    def _write(self, info, request):
+        name = re.sub(r"[^A-Za-z0-9._-]+", '_', info['path'].split('?', 1)[0]).strip('_')[:80] or 'root'
+        path = os.path.join(self._dir, '%06d_%s_%s.http' % (self.count + 1, info['method'], name))
+        f = open(path, 'wb')
+        try:
+            f.write(_array_bytes(request))
+        finally:
+            f.close()
+
+
+class _HarExportWriter(_ExportWriter):
+    # a single HAR 1.2 document; entries are written as they arrive and the
+    # enclosing structure is closed in close()
+    def __init__(self, path):
+        _ExportWriter.__init__(self)
+        self._f = open(path, 'wb')
+        self._started = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        self._f.write(b'{"log": {"version": "1.2", "creator": {"name": "Swagger2Burp", "version": "1.0"}, "entries": [\n')
+
+    def _write(self, info, request):
+        head, _, body = _array_bytes(request).partition(b'\r\n\r\n')
+        head = head.decode('utf-8', 'replace')
+        headers = []
+        for line in head.split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers.append({'name': name, 'value': value.strip()})
+        url = self._url(info)
+        query = []
+        if '?' in info['path']:
+            for pair in info['path'].split('?', 1)[1].split('&'):
+                name, _, value = pair.partition('=')
+                query.append({'name': unquote(name), 'value': unquote(value)})
+        request = OrderedDict([
+            ('method', info['method']), ('url', url), ('httpVersion', 'HTTP/1.1'),
+            ('cookies', []), ('headers', headers), ('queryString', query),
+            ('headersSize', -1), ('bodySize', len(body)),
+        ])
+        if info['body'] is not None:
+            request['postData'] = {'mimeType': info['content_type'] or '', 'text': _body_text(info['body'])}
+        entry = OrderedDict([
+            ('startedDateTime', self._started), ('time', 0), ('request', request),
+            ('response', {'status': 0, 'statusText': '', 'httpVersion': 'HTTP/1.1', 'cookies': [],
+                          'headers': [], 'content': {'size': 0, 'mimeType': ''}, 'redirectURL': '',
+                          'headersSize': -1, 'bodySize': -1}),
+            ('cache', {}), ('timings', {'send': 0, 'wait': 0, 'receive': 0}),
+            ('comment', info.get('caption') or ''),
+        ])
+        if self.count:
+            self._f.write(b',\n')
+        self._f.write(_encode_utf8(json.dumps(entry, default=_json_default)))
+
+    def close(self):
+        self._f.write(b'\n]}}\n')
+        self._f.close()
+
+
+class _BurpXmlExportWriter(_ExportWriter):
+    # the <items> format of Burp's "Save items", requests only
+    def __init__(self, path):
+        _ExportWriter.__init__(self)
+        self._f = open(path, 'wb')
+        self._time = time.strftime('%a %b %d %H:%M:%S %Z %Y')
+        self._f.write(_encode_utf8('<?xml version="1.0"?>\n<items burpVersion="" exportTime="%s">\n' % _xml_escape(self._time)))
+
+    def _write(self, info, request):
+        path = info['path']
+        ext = path.split('?', 1)[0].rsplit('/', 1)[-1]
+        ext = ext.rsplit('.', 1)[1] if '.' in ext else 'null'
+        xml = ('  <item>\n'
+               '    <time>%s</time>\n'
+               '    <url>%s</url>\n'
+               '    <host ip="">%s</host>\n'
+               '    <port>%d</port>\n'
+               '    <protocol>%s</protocol>\n'
+               '    <method>%s</method>\n'
+               '    <path>%s</path>\n'
+               '    <extension>%s</extension>\n'
+               '    <request base64="true">%s</request>\n'
+               '    <status></status>\n'
+               '    <responselength></responselength>\n'
+               '    <mimetype></mimetype>\n'
+               '    <response base64="true"></response>\n'
+               '    <comment>%s</comment>\n'
+               '  </item>\n') % (
+            _xml_escape(self._time), _xml_escape(self._url(info)), _xml_escape(info['host']), info['port'],
+            'https' if info['use_https'] else 'http', _xml_escape(info['method']), _xml_escape(path),
+            _xml_escape(ext), base64.b64encode(_array_bytes(request)).decode('ascii'),
+            _xml_escape(info.get('caption') or ''))
+        self._f.write(_encode_utf8(xml))
+
+    def close(self):
+        self._f.write(b'</items>\n')
+        self._f.close()
+
+
+class _RepeaterExportWriter(_ExportWriter):
+    # sends each request to Repeater instead of writing a file, pausing
+    # between batches like "Send selected"
+    def __init__(self, callbacks, batch_size, delay, cancel):
+        _ExportWriter.__init__(self)
+        self._callbacks = callbacks
+        self._batch_size = batch_size
+        self._delay = delay
+        self._cancel = cancel
+
+    def _write(self, info, request):
+        if self._delay and self.count and self.count % self._batch_size == 0:
+            self._cancel.wait(self._delay)
+        self._callbacks.sendToRepeater(info['host'], int(info['port']), info['use_https'],
+                                       request, info['caption'])
+
+
+def _xml_escape(text):
+    return (text or '').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+_EXPORT_FORMATS = OrderedDict([
+    ('Raw .http files (one per request)', _RawExportWriter),
+    ('HAR', _HarExportWriter),
+    ('Burp items XML', _BurpXmlExportWriter),
+    ('Send to Repeater', _RepeaterExportWriter),
+])
+
+
+def _encode_state(obj):
+    return base64.b64encode(zlib.compress(_encode_utf8(json.dumps(obj, separators=(',', ':'))))).decode('ascii')
+
+
+def _decode_state(text):
+    return json.loads(zlib.decompress(base64.b64decode(text)).decode('utf-8'))
+
+
+def _state_from_items(items, form, import_state=None, secrets=None):
+    # Compact form: header lists and bodies are shared by many operations,
+    # so they are stored once in tables and referenced by index. Headers
+    # named in `secrets` (lower case) are left out; the fingerprint contexts
+    # are dropped with them so the next import regenerates every request.
+    headers, header_ids = [], {}
+    bodies, body_ids = [], {}
+    rows = []
+    for info in items:
+        ser = info['serializer']
+        hid = header_ids.get(id(ser))
+        if hid is None:
+            hid = header_ids[id(ser)] = len(headers)
+            headers.append([list(h) for h in ser.headers if not secrets or h[0].lower() not in secrets])
+        body = info.get('body')
+        bid = -1
+        if body is not None:
+            bid = body_ids.get(body)
+            if bid is None:
+                bid = body_ids[body] = len(bodies)
+                bodies.append(body)
+        rows.append([info['method'], info['path'], info['host'], info['port'], info['use_https'],
+                     info['host_header'], info.get('content_type'), bid, hid, info['caption'], info.get('tag') or '',
+                     info.get('source'), info.get('op_key'), info.get('fp'), info.get('status') or '',
+                     info.get('operation_id') or ''])
+    contexts = {}
+    if not secrets:
+        contexts = dict((key, entry['context']) for key, entry in (import_state or {}).items())
+    return {'v': _STATE_VERSION, 'form': form, 'headers': headers, 'bodies': bodies, 'items': rows,
+            'contexts': contexts}
+
+
+def _items_from_state(state, format_hostport):
+    if state.get('v') != _STATE_VERSION:
+        return []
+    serializers = [_RequestSerializer([tuple(h) for h in hl]) for hl in state.get('headers') or []]
+    bodies = state.get('bodies') or []
+    items = []
+    for row in state.get('items') or []:
+        (method, path, host, port, use_https, host_header, ctype, bid, hid, caption, tag,
+         source, op_key, fp, status, op_id) = row
+        target = ('https' if use_https else 'http') + '://' + format_hostport(host, port, use_https)
+        items.append(_PreparedItem(method, path, target, host, port, use_https, host_header, serializers[hid],
+                                   bodies[bid] if bid >= 0 else None, ctype, caption, tag, op_id, op_key, fp,
+                                   status, source))
+    return items
+
+
+def _import_state_from_items(items, contexts):
+    # rebuild BurpExtender._importState from restored items
+    state = {}
+    for info in items:
+        key = info.get('source')
+        if key is None or key not in contexts or not info.get('op_key'):
+            continue
+        entry = state.get(key)
+        if entry is None:
+            entry = state[key] = {'context': contexts[key], 'items': {}}
+        entry['items'][info['op_key']] = info
+    return state
+
+
+def _first_result(func, items, concurrency):
+    # Run func over items on up to `concurrency` threads and return the first
+    # non-None result. Items not yet started are skipped once a result is
+    # found; calls already in flight finish and their results are discarded.
+    items = list(items)
+    if not items:
+        return None
+    lock = threading.Lock()
+    done = threading.Event()
+    state = {'next': 0, 'result': None, 'running': min(max(1, concurrency), len(items))}
+
+    def run():
+        try:
+            while not done.is_set():
+                with lock:
+                    i = state['next']
+                    if i >= len(items):
+                        break
+                    state['next'] = i + 1
+                try:
+                    res = func(items[i])
+                except Exception:
+                    res = None
+                if res is not None:
+                    with lock:
+                        if state['result'] is None:
+                            state['result'] = res
+                    done.set()
+        finally:
+            with lock:
+                state['running'] -= 1
+                if state['running'] == 0:
+                    done.set()
+
+    for _ in range(state['running']):
+        thr = threading.Thread(target=run)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+    done.wait()
+    with lock:
+        return state['result']
 
 
 class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
     def registerExtenderCallbacks(self, callbacks):
         self._callbacks = callbacks
         self._helpers = callbacks.getHelpers()
+        self._hostLimiter = None
+        self._specCache = _SpecCache()
+        self._logSink = _LogSink()
+        # per-source results of the last import, for incremental re-import
+        self._importState = {}
+        self._importCancel = None
         callbacks.setExtensionName('Swagger2Burp')
         callbacks.registerExtensionStateListener(self)
 
         self._panel = JPanel(BorderLayout())
         self._panel.add(self._build_ui(), BorderLayout.CENTER)
+        # log lines are batched and flushed to the text area on the EDT
+        self._logTimer = Timer(_LOG_FLUSH_MS, self._flush_log)
+        self._logTimer.start()
         callbacks.addSuiteTab(self)
+        self._restore_state_async()
 
     # ITab
     def getTabCaption(self):
@@ -371,8 +2396,12 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
 
     # IExtensionStateListener
     def extensionUnloaded(self):
-        # nothing to clean
-        pass
+        self._save_selection()
+        try:
+            self._logTimer.stop()
+        except Exception:
+            pass
+        self._logSink.close_file()
 
     def _build_ui(self):
         panel = JPanel(BorderLayout())
@@ -404,7 +2433,7 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
 
         # Base URL override
         gbc.gridx = 0; gbc.gridy = row; gbc.weightx = 0.0
-        form.add(JLabel('Base URL override (optional):'), gbc)
+        form.add(JLabel('Base URL override (optional; comma-separate several):'), gbc)
         self._baseUrlField = JTextField()
         gbc.gridx = 1; gbc.gridy = row; gbc.weightx = 1.0
         form.add(self._baseUrlField, gbc)
@@ -432,6 +2461,10 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
         self._fillPathParams = JCheckBox('Fill path parameters', True)
         self._useSpecServers = JCheckBox('Use servers/basePath from spec (unless base override is set)', True)
         self._useHttps = JCheckBox('Use HTTPS', True)
+        self._bypassCache = JCheckBox('Bypass spec cache (always re-download)', False)
+        self._streamJson = JCheckBox('Stream large JSON specs (decode paths one at a time)', True)
+        self._fanOutServers = JCheckBox('Bind to every server and server variable value (fan-out)', False)
+        self._rememberSecrets = JCheckBox('Remember JWT and custom headers between sessions', False)
 
         optsPanel = JPanel(GridBagLayout())
         gbc2 = GridBagConstraints()
@@ -444,7 +2477,36 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
         gbc2.gridy += 1
         optsPanel.add(self._useSpecServers, gbc2)
         gbc2.gridy += 1
+        optsPanel.add(self._fanOutServers, gbc2)
+        gbc2.gridy += 1
         optsPanel.add(self._useHttps, gbc2)
+        gbc2.gridy += 1
+        optsPanel.add(self._bypassCache, gbc2)
+        gbc2.gridy += 1
+        optsPanel.add(self._streamJson, gbc2)
+        gbc2.gridy += 1
+        optsPanel.add(self._rememberSecrets, gbc2)
+
+        self._concurrencyField = JTextField('8', 4)
+        self._perHostField = JTextField('4', 4)
+        fetchPanel = JPanel()
+        fetchPanel.add(JLabel('Fetch concurrency:'))
+        fetchPanel.add(self._concurrencyField)
+        fetchPanel.add(JLabel('Max connections per host:'))
+        fetchPanel.add(self._perHostField)
+        gbc2.gridy += 1
+        optsPanel.add(fetchPanel, gbc2)
+
+        # boundary/negative variants; only Export generates them
+        self._variantsField = JTextField('0', 4)
+        self._variantSeedField = JTextField('1', 6)
+        variantPanel = JPanel()
+        variantPanel.add(JLabel('Export variants per operation (0 = off):'))
+        variantPanel.add(self._variantsField)
+        variantPanel.add(JLabel('Seed:'))
+        variantPanel.add(self._variantSeedField)
+        gbc2.gridy += 1
+        optsPanel.add(variantPanel, gbc2)
 
         gbc.gridx = 0; gbc.gridy = row; gbc.weightx = 0.0
         form.add(JLabel('Options:'), gbc)
@@ -455,128 +2517,410 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
         # Buttons
         self._runBtn = JButton('Import', actionPerformed=self._on_import)
         self._clearLogBtn = JButton('Clear log', actionPerformed=self._on_clear_log)
+        self._clearCacheBtn = JButton('Clear spec cache', actionPerformed=self._on_clear_cache)
+
+        self._cancelImportBtn = JButton('Cancel import', actionPerformed=self._on_cancel_import)
+        self._cancelImportBtn.setEnabled(False)
+        self._importProgress = JProgressBar(0, 1)
+        self._importProgress.setStringPainted(True)
+        self._importProgress.setString('')
+        # export regenerates the requests straight to disk, bypassing the table
+        self._exportFormatCombo = JComboBox(list(_EXPORT_FORMATS.keys()))
+        self._exportBtn = JButton('Export...', actionPerformed=self._on_export)
 
         btnPanel = JPanel()
         btnPanel.add(self._runBtn)
+        btnPanel.add(self._cancelImportBtn)
+        btnPanel.add(self._importProgress)
+        btnPanel.add(self._exportFormatCombo)
+        btnPanel.add(self._exportBtn)
         btnPanel.add(self._clearLogBtn)
-
-        reqListPanel = JPanel(GridBagLayout())
-        self._requestsListPanel = reqListPanel
-        self._requestItems = []
-        reqScroll = JScrollPane(self._requestsListPanel)
+        btnPanel.add(self._clearCacheBtn)
+
+        # virtualized: JTable only renders the visible rows of the model
+        self._requestsModel = _RequestsTableModel()
+        self._requestsTable = JTable(self._requestsModel)
+        self._requestsTable.setFillsViewportHeight(True)
+        self._requestsTable.setSelectionMode(ListSelectionModel.MULTIPLE_INTERVAL_SELECTION)
+        for col, width in enumerate(_RequestsTableModel.WIDTHS):
+            try:
+                self._requestsTable.getColumnModel().getColumn(col).setPreferredWidth(width)
+            except Exception:
+                pass
+        try:
+            self._requestsTable.getColumnModel().getColumn(0).setMaxWidth(40)
+        except Exception:
+            pass
+        reqScroll = JScrollPane(self._requestsTable)
         reqScroll.setBorder(BorderFactory.createTitledBorder('Requests'))
-        self._selectAllChk = JCheckBox('Select all', False, actionPerformed=self._on_select_all)
+        self._selectAllChk = JCheckBox('Select all matching', False, actionPerformed=self._on_select_all)
+        # filter bar; the index is queried after a short pause in typing
+        self._filterField = JTextField(40)
+        self._filterField.setToolTipText(_ItemIndex.FILTER_HELP)
+        self._filterTimer = Timer(_FILTER_DELAY_MS, self._on_filter)
+        self._filterTimer.setRepeats(False)
+        self._filterField.getDocument().addDocumentListener(_FilterListener(self._filterTimer))
+        self._filterCount = JLabel('')
+        filterPanel = JPanel(BorderLayout())
+        filterPanel.add(JLabel('Filter: '), BorderLayout.WEST)
+        filterPanel.add(self._filterField, BorderLayout.CENTER)
+        filterPanel.add(self._filterCount, BorderLayout.EAST)
         self._sendSelectedBtn = JButton('Send selected to Repeater', actionPerformed=self._on_send_selected)
+        self._cancelSendBtn = JButton('Cancel send', actionPerformed=self._on_cancel_send)
+        self._cancelSendBtn.setEnabled(False)
+        self._sendBatchField = JTextField('20', 4)
+        self._sendDelayField = JTextField('200', 5)
+        self._sendProgress = JProgressBar(0, 1)
+        self._sendProgress.setStringPainted(True)
+        self._sendProgress.setString('')
+        self._sendCancel = None
         midPanel = JPanel(BorderLayout())
         midPanel.add(btnPanel, BorderLayout.NORTH)
         controlsPanel = JPanel()
         controlsPanel.add(self._selectAllChk)
+        controlsPanel.add(JLabel('Batch size:'))
+        controlsPanel.add(self._sendBatchField)
+        controlsPanel.add(JLabel('Delay between batches (ms):'))
+        controlsPanel.add(self._sendDelayField)
         controlsPanel.add(self._sendSelectedBtn)
-        midPanel.add(reqScroll, BorderLayout.CENTER)
+        controlsPanel.add(self._cancelSendBtn)
+        controlsPanel.add(self._sendProgress)
+        # request viewer; raw bytes are only built for the row being viewed
+        self._requestViewer = self._callbacks.createMessageEditor(None, False)
+        self._requestsTable.getSelectionModel().addListSelectionListener(self._on_row_selected)
+        reqSplit = JSplitPane(JSplitPane.HORIZONTAL_SPLIT, reqScroll, self._requestViewer.getComponent())
+        reqSplit.setResizeWeight(0.6)
+        reqPanel = JPanel(BorderLayout())
+        reqPanel.add(filterPanel, BorderLayout.NORTH)
+        reqPanel.add(reqSplit, BorderLayout.CENTER)
+        midPanel.add(reqPanel, BorderLayout.CENTER)
         midPanel.add(controlsPanel, BorderLayout.SOUTH)
 
         # Log area
         self._logArea = JTextArea(10, 80)
         self._logArea.setEditable(False)
         logScroll = JScrollPane(self._logArea)
-        logScroll.setBorder(BorderFactory.createTitledBorder('Log'))
+        self._logLevelCombo = JComboBox(_LOG_LEVEL_NAMES, actionPerformed=self._on_log_level)
+        self._logLevelCombo.setSelectedItem('INFO')
+        self._logFileBtn = JButton('Log to file...', actionPerformed=self._on_log_to_file)
+        logControls = JPanel()
+        logControls.add(JLabel('Level:'))
+        logControls.add(self._logLevelCombo)
+        logControls.add(self._logFileBtn)
+        logPanel = JPanel(BorderLayout())
+        logPanel.add(logControls, BorderLayout.NORTH)
+        logPanel.add(logScroll, BorderLayout.CENTER)
 
         panel.add(form, BorderLayout.NORTH)
         panel.add(midPanel, BorderLayout.CENTER)
-        panel.add(logScroll, BorderLayout.SOUTH)
+        # Import stats: per-source phase breakdown of the last import
+        self._statsModel = _StatsTableModel()
+        self._statsReport = None
+        statsTable = JTable(self._statsModel)
+        statsTable.setFillsViewportHeight(True)
+        try:
+            statsTable.getColumnModel().getColumn(0).setPreferredWidth(400)
+        except Exception:
+            pass
+        self._statsSummary = JLabel('No import yet.')
+        self._exportStatsBtn = JButton('Export JSON...', actionPerformed=self._on_export_stats)
+        statsControls = JPanel()
+        statsControls.add(self._statsSummary)
+        statsControls.add(self._exportStatsBtn)
+        statsPanel = JPanel(BorderLayout())
+        statsPanel.add(statsControls, BorderLayout.NORTH)
+        statsPanel.add(JScrollPane(statsTable), BorderLayout.CENTER)
+
+        bottomTabs = JTabbedPane()
+        bottomTabs.addTab('Log', logPanel)
+        bottomTabs.addTab('Import stats', statsPanel)
+        panel.add(bottomTabs, BorderLayout.SOUTH)
         return panel
 
-    def _log(self, msg):
+    def _log(self, msg, level=_INFO):
+        # Safe from any thread: records go to the sink and reach the text
+        # area on the next _flush_log tick.
+        try:
+            self._logSink.emit(level, msg)
+        except Exception:
+            pass
+
+    def _flush_log(self, event=None):
+        lines = self._logSink.drain()
+        if not lines:
+            return
         try:
-            self._logArea.append(str(msg) + '\n')
-            self._logArea.setCaretPosition(self._logArea.getDocument().getLength())
+            area = self._logArea
+            area.append('\n'.join(lines) + '\n')
+            excess = area.getLineCount() - 1 - _LOG_MAX_UI_LINES
+            if excess > 0:
+                area.getDocument().remove(0, area.getLineStartOffset(excess))
+            area.setCaretPosition(area.getDocument().getLength())
         except Exception:
             pass
 
     def _on_clear_log(self, event):
+        self._logSink.clear()
         self._logArea.setText('')
 
-    def _on_import(self, event):
-        jwt = _strip(self._jwtField.getText())
-        custom_headers = _parse_custom_headers(self._headersArea.getText() or '')
-        base_override = _strip(self._baseUrlField.getText())
+    def _on_log_level(self, event):
+        level = _LOG_LEVELS.get(self._logLevelCombo.getSelectedItem(), _INFO)
+        lines = self._logSink.set_level(level)
+        self._logArea.setText('')
+        if lines:
+            self._logArea.append('\n'.join(lines[-_LOG_MAX_UI_LINES:]) + '\n')
+
+    def _on_log_to_file(self, event):
+        if self._logSink.has_file():
+            self._logSink.close_file()
+            self._logFileBtn.setText('Log to file...')
+            self._log('Stopped logging to file.')
+            return
+        chooser = JFileChooser()
+        if chooser.showSaveDialog(self._panel) != JFileChooser.APPROVE_OPTION:
+            return
+        path = chooser.getSelectedFile().getAbsolutePath()
+        try:
+            self._logSink.open_file(path)
+        except Exception as e:
+            self._log('Cannot open log file %s (%s)' % (path, e), _ERROR)
+            return
+        self._logFileBtn.setText('Stop logging to file')
+        self._log('Logging to %s' % path)
+
+    def _show_stats(self, report):
+        self._statsReport = report
+        self._statsModel.set_rows(report['sources'] + [report['totals']])
+        self._statsSummary.setText('Last import: %d ms wall clock, %d ms to populate the table.'
+                                   % (report['total_ms'], report['populate_ms']))
+
+    def _on_export_stats(self, event):
+        if self._statsReport is None:
+            self._log('No import stats to export yet.', _WARN)
+            return
+        chooser = JFileChooser()
+        if chooser.showSaveDialog(self._panel) != JFileChooser.APPROVE_OPTION:
+            return
+        path = chooser.getSelectedFile().getAbsolutePath()
+        try:
+            f = open(path, 'wb')
+            try:
+                f.write(_encode_utf8(json.dumps(self._statsReport, indent=2)))
+            finally:
+                f.close()
+        except Exception as e:
+            self._log('Cannot write stats to %s (%s)' % (path, e), _ERROR)
+            return
+        self._log('Import stats written to %s' % path)
+
+    def _on_clear_cache(self, event):
+        self._specCache.clear()
+        self._log('Spec cache cleared.')
 
+    def _collect_sources(self):
+        # sources are (kind, text) pairs, classified once here
         sources_raw = self._sourcesArea.getText() or ''
         mode = self._modeCombo.getSelectedItem()
-
-        # prepare fetch headers for spec retrieval
-        spec_fetch_headers = {}
-        if jwt:
-            spec_fetch_headers['Authorization'] = 'Bearer ' + jwt
-        for name, val in custom_headers:
-            if name.lower() == 'authorization' and 'Authorization' in spec_fetch_headers:
-                continue
-            spec_fetch_headers[name] = val
-
         sources = []
         if mode == 'Raw JSON':
             # entire area is JSON
             if not _is_json_text(sources_raw):
-                self._log('Input mode is Raw JSON but content is not JSON.')
-                return
-            sources = [sources_raw]
+                self._log('Input mode is Raw JSON but content is not JSON.', _WARN)
+                return None
+            sources = [('json', sources_raw)]
+        elif mode != 'URL(s)' and _is_json_text(sources_raw):
+            # Auto-detect: if the content is JSON, treat the entire area as one spec
+            sources = [('json', sources_raw)]
         else:
-            # split by lines; if any line looks like JSON begin, join remainder
             lines = [l.strip() for l in sources_raw.splitlines() if l.strip()]
-            if mode == 'URL(s)':
-                sources = lines
-            else:
-                # Auto-detect per line; if first non-empty is JSON, treat entire as JSON
-                if sources_raw.strip() and _is_json_text(sources_raw.strip()):
-                    sources = [sources_raw.strip()]
-                else:
-                    sources = lines
+            sources = [(_source_kind(l), l) for l in lines]
 
         if not sources:
-            self._log('No sources provided.')
+            self._log('No sources provided.', _WARN)
+            return None
+        return sources
+
+    def _on_import(self, event):
+        jwt = _strip(self._jwtField.getText())
+        custom_headers = _parse_custom_headers(self._headersArea.getText() or '')
+
+        spec_fetch_headers = _spec_fetch_headers(jwt, custom_headers)
+        sources = self._collect_sources()
+        if not sources:
             return
+        # URLs are matched to the previous import by URL, pasted documents by position
+        sources = [(kind, src, src if kind == 'url' else '%s#%d' % (kind, i), _ImportStats(_source_label(kind, src)))
+                   for i, (kind, src) in enumerate(sources)]
+        import_started = time.time()
+        import_state = self._importState
+
+        options = self._collect_options()
+        form_state = self._form_state()
+        use_cache = not self._bypassCache.isSelected()
+        concurrency = _parse_int(self._concurrencyField.getText(), 8)
+        self._hostLimiter = _HostLimiter(_parse_int(self._perHostField.getText(), 4))
 
         # Run heavy work off the UI thread
+        cancel = threading.Event()
+        self._importCancel = cancel
         self._runBtn.setEnabled(False)
+        self._exportBtn.setEnabled(False)
+        self._cancelImportBtn.setEnabled(True)
+        total_sources = len(sources)
+        self._importProgress.setMaximum(total_sources)
+        self._importProgress.setValue(0)
+        self._importProgress.setString('0 / %d sources' % total_sources)
+        # progress is coalesced: at most one UI update is queued at a time
+        progress = {'sources': 0, 'operations': 0, 'queued': False}
+        progress_lock = threading.Lock()
+
+        def _report(sources_done=0, operations=0):
+            with progress_lock:
+                progress['sources'] += sources_done
+                progress['operations'] += operations
+                if progress['queued']:
+                    return
+                progress['queued'] = True
+
+            def _show():
+                with progress_lock:
+                    progress['queued'] = False
+                    done, ops = progress['sources'], progress['operations']
+                self._importProgress.setValue(done)
+                self._importProgress.setString('%d / %d sources, %d operations' % (done, total_sources, ops))
+            self._on_ui(_show)
+
         try:
             self._selectAllChk.setSelected(False)
         except Exception:
             pass
         try:
-            self._requestItems = []
-            self._requestsListPanel.removeAll()
-            self._requestsListPanel.revalidate()
-            self._requestsListPanel.repaint()
+            prev_selected = set((info.get('source'), info.get('op_key'))
+                                for info in self._requestsModel.selected_items())
+            self._requestsModel.set_items([])
         except Exception:
-            pass
+            prev_selected = set()
+        # documents behind external $refs are fetched once per import, however
+        # many sources refer to them, so their transfer gets its own stats row
+        ref_stats = _ImportStats('External $ref documents')
+        documents = self._external_documents(spec_fetch_headers, [src[:2] for src in sources], ref_stats)
+
+        def _load_and_process(source):
+            kind, src, key, stats = source
+            stats.status = 'running'
+            if kind == 'json':
+                self._log('Loading spec from pasted JSON')
+            elif kind == 'url':
+                self._log('Fetching spec: %s' % src)
+            origin = {}
+            try:
+                spec = self._load_spec_from_source_burp(src, spec_fetch_headers, use_cache, options['stream_json'],
+                                                        kind, stats, origin)
+                self._prefetch_external_refs(spec, origin, documents, concurrency, cancel)
+            except _Cancelled:
+                stats.status = 'cancelled'
+                return [], None
+            except Exception as e:
+                self._log('Failed to load spec from source: %s (%s)' % (_source_label(kind, src), e), _ERROR)
+                stats.status = 'load failed'
+                _report(sources_done=1)
+                return [], None
+            meta = {}
+            started = time.time()
+            try:
+                items = self._process_spec(spec, jwt, custom_headers, True, options,
+                                           previous=import_state.get(key), meta=meta, cancel=cancel,
+                                           progress=lambda n: _report(operations=n), documents=documents,
+                                           base_url=origin.get('url'))
+            except Exception as e:
+                self._log('Error processing spec: %s' % e, _ERROR)
+                stats.status = 'generate failed'
+                return [], None
+            finally:
+                stats.add_time('generate_ms', started)
+            if not isinstance(items, list):
+                stats.status = 'generate failed'
+                return [], None
+            for info in items:
+                info['source'] = key
+            stats.add('operations', len(items))
+            for k in ('reused', 'skipped', 'bodies'):
+                stats.add(k, meta.get(k) or 0)
+            if meta.get('cancelled'):
+                stats.status = 'cancelled'
+                return items, meta
+            stats.status = 'done'
+            _report(sources_done=1)
+            return items, meta
+
         def _worker():
             all_items = []
-            for src in sources:
-                try:
-                    if _is_json_text(src):
-                        self._log('Loading spec from pasted JSON')
-                    elif _looks_like_url(src):
-                        self._log('Fetching spec: %s' % src)
-                    spec = self._load_spec_from_source_burp(src, spec_fetch_headers)
-                except Exception as e:
-                    self._log('Failed to load spec from source: %s (%s)' % (src, e))
+            new_state = {}
+            removed = []
+            # fetch + parse + generate in parallel; results are merged in source order
+            for (kind, src, key, stats), result, err in _iter_parallel(_load_and_process, sources, concurrency, cancel):
+                meta = None
+                if err is None:
+                    items, meta = result
+                    all_items.extend(items)
+                else:
+                    self._log('Error processing source: %s (%s)' % (_source_label(kind, src), err), _ERROR)
+                    stats.status = 'failed'
+                    _report(sources_done=1)
+                if meta is None or meta.get('cancelled'):
                     continue
-
-                try:
-                    items = self._process_spec(spec, jwt, custom_headers, base_override, True)
-                    if isinstance(items, list):
-                        all_items.extend(items)
-                except Exception as e:
-                    self._log('Error processing spec: %s' % e)
-
+                new_state[key] = {'context': meta['context'],
+                                  'items': dict((info['op_key'], info) for info in items)}
+                if key in import_state:
+                    removed.extend((key, op_key) for op_key in meta['removed'])
+            # failed, cancelled or partial sources keep their last good result,
+            # so the next import still diffs against it
+            for kind, src, key, stats in sources:
+                if key not in new_state and key in import_state:
+                    new_state[key] = import_state[key]
+                if stats.status in ('pending', 'running'):
+                    stats.status = 'cancelled'
+            self._importState = new_state
+            cancelled = cancel.is_set()
+            ref_stats.status = 'cancelled' if cancelled else 'done'
+            if cancelled:
+                self._log('Import cancelled; keeping %d request(s) prepared so far.' % len(all_items), _WARN)
+
+            if import_state:
+                added = sum(1 for info in all_items if info.get('status') == 'new')
+                changed = sum(1 for info in all_items if info.get('status') == 'changed')
+                self._log('Re-import: %d new, %d changed, %d unchanged, %d removed operation(s).'
+                          % (added, changed, len(all_items) - added - changed, len(removed)))
+                for key, op_key in removed[:_MAX_REPORTED_FAILURES]:
+                    self._log('  removed: %s (%s)' % (op_key, key))
+                if len(removed) > _MAX_REPORTED_FAILURES:
+                    self._log('  ... and %d more' % (len(removed) - _MAX_REPORTED_FAILURES))
             self._log('Prepared %d request(s). Review and send selected.' % len(all_items))
+            self._save_state_async(all_items, form_state, new_state)
+            keep = [i for i, info in enumerate(all_items)
+                    if not info.get('status') and (info.get('source'), info.get('op_key')) in prev_selected]
+            index = _ItemIndex(all_items)
             def _ui_update():
+                started = time.time()
                 try:
-                    self._populate_requests_list(all_items)
+                    self._populate_requests_list(all_items, index)
+                    self._requestsModel.set_selected_rows(keep)
                 except Exception:
                     pass
+                populate_ms = int(round((time.time() - started) * 1000))
+                total_ms = int(round((time.time() - import_started) * 1000))
+                shared = [ref_stats] if ref_stats.get('requests') else []
+                self._show_stats(_stats_report([src[3] for src in sources], total_ms, populate_ms, shared))
+                self._importCancel = None
                 try:
                     self._runBtn.setEnabled(True)
+                    self._exportBtn.setEnabled(True)
+                    self._cancelImportBtn.setEnabled(False)
+                    with progress_lock:
+                        done, ops = progress['sources'], progress['operations']
+                    self._importProgress.setValue(done)
+                    self._importProgress.setString('%d / %d sources, %d operations%s'
+                                                   % (done, total_sources, ops, ' (cancelled)' if cancelled else ''))
                 except Exception:
                     pass
             try:
@@ -591,6 +2935,116 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
             pass
         thr.start()
 
+    def _on_export(self, event):
+        if self._importCancel is not None:
+            self._log('An import or export is already running.', _WARN)
+            return
+        jwt = _strip(self._jwtField.getText())
+        custom_headers = _parse_custom_headers(self._headersArea.getText() or '')
+        sources = self._collect_sources()
+        if not sources:
+            return
+        writer_cls = _EXPORT_FORMATS[self._exportFormatCombo.getSelectedItem()]
+        cancel = threading.Event()
+        if writer_cls is _RepeaterExportWriter:
+            path = 'Repeater'
+            writer = _RepeaterExportWriter(self._callbacks, _parse_int(self._sendBatchField.getText(), 20),
+                                           _parse_int(self._sendDelayField.getText(), 200, minimum=0) / 1000.0,
+                                           cancel)
+        else:
+            chooser = JFileChooser()
+            if writer_cls is _RawExportWriter:
+                chooser.setFileSelectionMode(JFileChooser.DIRECTORIES_ONLY)
+            if chooser.showSaveDialog(self._panel) != JFileChooser.APPROVE_OPTION:
+                return
+            path = chooser.getSelectedFile().getAbsolutePath()
+            try:
+                writer = writer_cls(path)
+            except Exception as e:
+                self._log('Cannot write export to %s (%s)' % (path, e), _ERROR)
+                return
+
+        spec_fetch_headers = _spec_fetch_headers(jwt, custom_headers)
+        options = self._collect_options()
+        use_cache = not self._bypassCache.isSelected()
+        concurrency = _parse_int(self._concurrencyField.getText(), 8)
+        self._hostLimiter = _HostLimiter(_parse_int(self._perHostField.getText(), 4))
+        if options['variants']:
+            self._log('Adding up to %d variant(s) per operation (seed %d).' % (options['variants'], options['variant_seed']))
+
+        self._importCancel = cancel
+        self._runBtn.setEnabled(False)
+        self._exportBtn.setEnabled(False)
+        self._cancelImportBtn.setEnabled(True)
+        total_sources = len(sources)
+        self._importProgress.setMaximum(total_sources)
+        self._importProgress.setValue(0)
+        self._importProgress.setString('0 / %d sources' % total_sources)
+
+        def _progress(done):
+            count = writer.count
+
+            def _show():
+                self._importProgress.setValue(done)
+                self._importProgress.setString('%d / %d sources, %d exported' % (done, total_sources, count))
+            self._on_ui(_show)
+
+        documents = self._external_documents(spec_fetch_headers, sources)
+
+        def _load(source):
+            kind, src = source
+            origin = {}
+            spec = self._load_spec_from_source_burp(src, spec_fetch_headers, use_cache, options['stream_json'], kind,
+                                                    None, origin)
+            self._prefetch_external_refs(spec, origin, documents, concurrency, cancel)
+            return spec, origin
+
+        def _worker():
+            done = 0
+            try:
+                # specs load in parallel; generation runs here, in source order,
+                # so the output file is written by a single thread
+                for (kind, src), loaded, err in _iter_parallel(_load, sources, concurrency, cancel):
+                    done += 1
+                    if err is not None:
+                        if not isinstance(err, _Cancelled):
+                            self._log('Failed to load spec from source: %s (%s)' % (_source_label(kind, src), err), _ERROR)
+                        continue
+                    if cancel.is_set():
+                        break
+                    try:
+                        self._process_spec(loaded[0], jwt, custom_headers, True, options, cancel=cancel,
+                                           progress=lambda n: _progress(done - 1), sink=writer.write,
+                                           documents=documents, base_url=loaded[1].get('url'))
+                    except Exception as e:
+                        self._log('Export failed for %s (%s)' % (_source_label(kind, src), e), _ERROR)
+                    _progress(done)
+            finally:
+                try:
+                    writer.close()
+                except Exception as e:
+                    self._log('Cannot finish export file %s (%s)' % (path, e), _ERROR)
+            cancelled = cancel.is_set()
+            self._log('%s %d request(s) to %s' % ('Export cancelled after' if cancelled else 'Exported',
+                                                 writer.count, path), _WARN if cancelled else _INFO)
+
+            def _ui_update():
+                self._importCancel = None
+                self._runBtn.setEnabled(True)
+                self._exportBtn.setEnabled(True)
+                self._cancelImportBtn.setEnabled(False)
+                self._importProgress.setValue(done)
+                self._importProgress.setString('%d / %d sources, %d exported%s'
+                                               % (done, total_sources, writer.count, ' (cancelled)' if cancelled else ''))
+            self._on_ui(_ui_update)
+
+        thr = threading.Thread(target=_worker)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+
     def _format_hostport(self, host, port, use_https):
         try:
             if host is None:
@@ -601,62 +3055,266 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
         except Exception:
             return str(host)
 
-    def _populate_requests_list(self, items):
-        try:
-            self._requestItems = []
-            self._requestsListPanel.removeAll()
-            gbc = GridBagConstraints()
-            gbc.insets = Insets(2, 2, 2, 2)
-            gbc.anchor = GridBagConstraints.WEST
-            gbc.fill = GridBagConstraints.HORIZONTAL
-            gbc.weightx = 1.0
-            gbc.gridx = 0
-            row = 0
-            for info in items:
-                label = info.get('label') or ''
-                cb = JCheckBox(label)
-                gbc.gridy = row
-                self._requestsListPanel.add(cb, gbc)
-                self._requestItems.append({'checkbox': cb, 'data': info})
-                row += 1
-            self._requestsListPanel.revalidate()
-            self._requestsListPanel.repaint()
+    def _populate_requests_list(self, items, index=None):
+        try:
+            self._requestsModel.set_items(items, index)
+            self._on_filter()
+        except Exception as e:
+            self._log('Failed to populate request list: %s' % e, _ERROR)
+
+    def _on_filter(self, event=None):
+        model = self._requestsModel
+        shown = model.set_filter(self._filterField.getText())
+        total = len(model.items())
+        self._filterCount.setText(' %d of %d' % (shown, total) if shown != total else ' %d' % total)
+
+    def _on_row_selected(self, event):
+        try:
+            if event.getValueIsAdjusting():
+                return
+            row = self._requestsTable.getSelectedRow()
+            if row < 0:
+                return
+            info = self._requestsModel.item_at(row)
+            self._requestViewer.setMessage(_item_request_bytes(info), True)
         except Exception as e:
-            self._log('Failed to populate request list: %s' % e)
+            self._log('Failed to show request: %s' % e, _ERROR)
 
     def _on_select_all(self, event):
         try:
-            sel = self._selectAllChk.isSelected()
-            for it in (self._requestItems or []):
-                try:
-                    it['checkbox'].setSelected(sel)
-                except Exception:
-                    pass
+            self._requestsModel.set_all_selected(self._selectAllChk.isSelected())
         except Exception:
             pass
+        self._save_selection()
 
     def _on_send_selected(self, event):
         callbacks = self._callbacks
-        selected = []
         try:
-            for it in (self._requestItems or []):
-                try:
-                    if it['checkbox'].isSelected():
-                        selected.append(it['data'])
-                except Exception:
-                    continue
+            selected = self._requestsModel.selected_items()
         except Exception:
             selected = []
-        cnt = 0
-        for info in selected:
+        if not selected:
+            self._log('No requests selected.')
+            return
+        if self._sendCancel is not None:
+            self._log('A send is already in progress.')
+            return
+        batch_size = _parse_int(self._sendBatchField.getText(), 20)
+        delay = _parse_int(self._sendDelayField.getText(), 200, minimum=0) / 1000.0
+        cancel = threading.Event()
+        self._sendCancel = cancel
+        total = len(selected)
+        self._sendSelectedBtn.setEnabled(False)
+        self._cancelSendBtn.setEnabled(True)
+        self._sendProgress.setMaximum(total)
+        self._sendProgress.setValue(0)
+        self._sendProgress.setString('0 / %d' % total)
+
+        def _progress(done):
+            def _update():
+                self._sendProgress.setValue(done)
+                self._sendProgress.setString('%d / %d' % (done, total))
+            self._on_ui(_update)
+
+        def _sender():
+            cnt = 0
+            done = 0
+            failures = []
+            for info in selected:
+                if cancel.is_set():
+                    break
+                try:
+                    req_bytes = _item_request_bytes(info)
+                    callbacks.sendToRepeater(info['host'], int(info['port']), info['use_https'], req_bytes, info['caption'])
+                    cnt += 1
+                except Exception as e:
+                    failures.append((info.get('caption'), e))
+                done += 1
+                if done % batch_size == 0 and done < total:
+                    _progress(done)
+                    # throttle between batches; returns early on cancel
+                    if delay:
+                        cancel.wait(delay)
+            _progress(done)
+            if cancel.is_set() and done < total:
+                self._log('Send cancelled after %d of %d request(s).' % (done, total))
+            self._log('Sent %d request(s) to Repeater.' % cnt)
+            if failures:
+                self._log('Failed to send %d request(s):' % len(failures), _ERROR)
+                for caption, err in failures[:_MAX_REPORTED_FAILURES]:
+                    self._log('  %s: %s' % (caption, err), _ERROR)
+                if len(failures) > _MAX_REPORTED_FAILURES:
+                    self._log('  ... and %d more' % (len(failures) - _MAX_REPORTED_FAILURES), _ERROR)
+
+            def _finish():
+                self._sendCancel = None
+                self._sendSelectedBtn.setEnabled(True)
+                self._cancelSendBtn.setEnabled(False)
+                self._save_selection()
+            self._on_ui(_finish)
+
+        thr = threading.Thread(target=_sender)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+
+    def _on_cancel_send(self, event):
+        cancel = self._sendCancel
+        if cancel is not None:
+            cancel.set()
+
+    def _on_cancel_import(self, event):
+        cancel = self._importCancel
+        if cancel is not None:
+            cancel.set()
+            self._cancelImportBtn.setEnabled(False)
+            self._log('Cancelling import...')
+
+    def _on_ui(self, fn):
+        try:
+            SwingUtilities.invokeLater(fn)
+        except Exception:
+            fn()
+
+    # Persistence: the prepared list is saved to Burp's extension settings
+    # after every import and restored (without any network traffic or spec
+    # processing) when the extension loads.
+    def _form_state(self):
+        return {
+            'jwt': self._jwtField.getText() or '',
+            'headers': self._headersArea.getText() or '',
+            'base_url': self._baseUrlField.getText() or '',
+            'mode': self._modeCombo.getSelectedItem(),
+            'sources': self._sourcesArea.getText() or '',
+            'include_query': self._includeQuery.isSelected(),
+            'fill_path_params': self._fillPathParams.isSelected(),
+            'use_spec_servers': self._useSpecServers.isSelected(),
+            'use_https': self._useHttps.isSelected(),
+            'bypass_cache': self._bypassCache.isSelected(),
+            'stream_json': self._streamJson.isSelected(),
+            'fan_out_servers': self._fanOutServers.isSelected(),
+            'remember_secrets': self._rememberSecrets.isSelected(),
+            'concurrency': self._concurrencyField.getText() or '',
+            'per_host': self._perHostField.getText() or '',
+            'variants': self._variantsField.getText() or '',
+            'variant_seed': self._variantSeedField.getText() or '',
+        }
+
+    def _apply_form_state(self, form):
+        for key, field in (('jwt', self._jwtField), ('headers', self._headersArea),
+                           ('base_url', self._baseUrlField), ('sources', self._sourcesArea),
+                           ('concurrency', self._concurrencyField), ('per_host', self._perHostField),
+                           ('variants', self._variantsField), ('variant_seed', self._variantSeedField)):
+            if key in form:
+                field.setText(form[key])
+        for key, chk in (('include_query', self._includeQuery), ('fill_path_params', self._fillPathParams),
+                         ('use_spec_servers', self._useSpecServers), ('use_https', self._useHttps),
+                         ('bypass_cache', self._bypassCache), ('stream_json', self._streamJson),
+                         ('fan_out_servers', self._fanOutServers), ('remember_secrets', self._rememberSecrets)):
+            if key in form:
+                chk.setSelected(bool(form[key]))
+        if form.get('mode'):
+            self._modeCombo.setSelectedItem(form['mode'])
+
+    def _save_state_async(self, items, form, import_state=None):
+        secrets = None
+        if not form.get('remember_secrets'):
+            # the JWT and custom headers stay out of the form and of the saved
+            # header lists unless the user asked for them to be remembered
+            custom = _parse_custom_headers(form.get('headers') or '')
+            if _strip(form.get('jwt')) or custom:
+                secrets = set(['authorization'] + [n.lower() for n, _ in custom])
+            form = dict((k, v) for k, v in form.items() if k not in ('jwt', 'headers'))
+        # the previous selection refers to the previous list; clear it here,
+        # before the UI can save a selection for the new one
+        try:
+            self._callbacks.saveExtensionSetting(_SELECTION_KEY, None)
+        except Exception as e:
+            self._log('Failed to save selection: %s' % e, _WARN)
+
+        def _save():
             try:
-                callbacks.sendToRepeater(info['host'], int(info['port']), info['use_https'], info['req_bytes'], info['caption'])
-                cnt += 1
+                state = _state_from_items(items, form, import_state, secrets)
+                self._save_setting_blob(_STATE_KEY, _encode_state(state))
+                self._log('Saved %d prepared request(s) for the next session.' % len(items), _DEBUG)
             except Exception as e:
-                self._log('Failed to send to Repeater: %s' % e)
-        self._log('Sent %d request(s) to Repeater.' % cnt)
+                self._log('Failed to save state: %s' % e, _WARN)
+        thr = threading.Thread(target=_save)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+
+    def _save_selection(self):
+        try:
+            rows = [i for i, sel in enumerate(self._requestsModel.selection()) if sel]
+            self._callbacks.saveExtensionSetting(_SELECTION_KEY, _encode_state(rows))
+        except Exception as e:
+            self._log('Failed to save selection: %s' % e, _WARN)
 
-    def _http_fetch(self, url, headers, max_redirects=3):
+    def _restore_state_async(self):
+        def _restore():
+            try:
+                blob = self._load_setting_blob(_STATE_KEY)
+                if not blob:
+                    return
+                state = _decode_state(blob)
+                items = _items_from_state(state, self._format_hostport)
+                index = _ItemIndex(items)
+                selection = state.get('selected') or []
+                sel_blob = self._callbacks.loadExtensionSetting(_SELECTION_KEY)
+                if sel_blob:
+                    selection = _decode_state(sel_blob)
+            except Exception as e:
+                self._log('Failed to restore saved state: %s' % e, _WARN)
+                return
+
+            def _apply():
+                try:
+                    self._apply_form_state(state.get('form') or {})
+                    self._importState = _import_state_from_items(items, state.get('contexts') or {})
+                    self._populate_requests_list(items, index)
+                    self._requestsModel.set_selected_rows(selection)
+                except Exception as e:
+                    self._log('Failed to restore saved state: %s' % e, _WARN)
+                    return
+                self._log('Restored %d prepared request(s) from the previous session.' % len(items))
+            self._on_ui(_apply)
+        thr = threading.Thread(target=_restore)
+        try:
+            thr.setDaemon(True)
+        except Exception:
+            pass
+        thr.start()
+
+    def _save_setting_blob(self, key, text):
+        # split into chunks so no single setting value gets too large
+        callbacks = self._callbacks
+        chunks = [text[i:i + _STATE_CHUNK_CHARS] for i in range(0, len(text), _STATE_CHUNK_CHARS)]
+        old = _parse_int(callbacks.loadExtensionSetting(key + '.count'), 0, minimum=0)
+        for i, chunk in enumerate(chunks):
+            callbacks.saveExtensionSetting('%s.%d' % (key, i), chunk)
+        for i in range(len(chunks), old):
+            callbacks.saveExtensionSetting('%s.%d' % (key, i), None)
+        callbacks.saveExtensionSetting(key + '.count', str(len(chunks)))
+
+    def _load_setting_blob(self, key):
+        callbacks = self._callbacks
+        count = _parse_int(callbacks.loadExtensionSetting(key + '.count'), 0, minimum=0)
+        chunks = []
+        for i in range(count):
+            chunk = callbacks.loadExtensionSetting('%s.%d' % (key, i))
+            if chunk is None:
+                return None
+            chunks.append(chunk)
+        return ''.join(chunks)
+
+    def _http_fetch(self, url, headers, max_redirects=3, meta=None, stats=None):
+        # `meta`, when given, receives the final status code and response header lines.
+        # `stats` (_ImportStats) accumulates request count, time and bytes received.
         u = urlparse(url)
         if not u.scheme or not u.netloc:
             raise Exception('Invalid URL')
@@ -689,19 +3347,34 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
         # Prefer modern overload returning IHttpRequestResponse
         headers_list = None
         raw_head = None
+        limiter = self._hostLimiter
+        cancel = self._importCancel
+        if cancel is not None and cancel.is_set():
+            raise _Cancelled('Import cancelled')
+        sem = limiter.acquire(host, port) if limiter is not None else None
+        started = time.time()
         try:
-            service = self._helpers.buildHttpService(host, int(port), use_https)
-            rr = self._callbacks.makeHttpRequest(service, req_bytes)
             try:
-                resp_bytes = rr.getResponse()
+                service = self._helpers.buildHttpService(host, int(port), use_https)
+                rr = self._callbacks.makeHttpRequest(service, req_bytes)
+                try:
+                    resp_bytes = rr.getResponse()
+                except Exception:
+                    resp_bytes = rr
             except Exception:
-                resp_bytes = rr
-        except Exception:
-            # Fallback to legacy overload returning raw bytes/array
-            resp_bytes = self._callbacks.makeHttpRequest(host, int(port), use_https, req_bytes)
+                # Fallback to legacy overload returning raw bytes/array
+                resp_bytes = self._callbacks.makeHttpRequest(host, int(port), use_https, req_bytes)
+        finally:
+            if sem is not None:
+                sem.release()
+            if stats is not None:
+                stats.add_time('fetch_ms', started)
+                stats.add('requests', 1)
 
         if resp_bytes is None:
             raise Exception('No response received')
+        if stats is not None:
+            stats.add('bytes', len(resp_bytes))
 
         # Try to use helpers.analyzeResponse; if that fails, do a manual parse
         status = 0
@@ -755,7 +3428,7 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
                 pass
 
         try:
-            self._log('Fetch %s -> HTTP %s' % (url, status))
+            self._log('Fetch %s -> HTTP %s' % (url, status), _DEBUG)
         except Exception:
             pass
 
@@ -787,77 +3460,338 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
                             loc = _uj(base + u.path, loc)
                         except Exception:
                             loc = base + '/' + loc
-                return self._http_fetch(loc, headers, max_redirects - 1)
-
+                return self._http_fetch(loc, headers, max_redirects - 1, meta, stats)
+
+        if meta is not None:
+            meta['status'] = status
+            meta['url'] = url
+            if headers_list is not None:
+                meta['headers'] = headers_list
+            elif raw_head is not None:
+                meta['headers'] = raw_head.split('\r\n')
+            else:
+                meta['headers'] = []
         return body, ctype
 
-    def _load_spec_from_source_burp(self, src, fetch_headers):
-        s = _strip(src)
-        if not s:
+    def _load_spec_from_source_burp(self, src, fetch_headers, use_cache=True, stream=False, kind=None, stats=None,
+                                    origin=None):
+        # `origin`, when given, receives the URL the spec was loaded from
+        # ('url', for relative $refs) and the external $refs found in its
+        # text ('refs'; missing when the text was not available).
+        if origin is None:
+            origin = {}
+        if kind is None:
+            kind = _source_kind(src)
+        if kind is None:
             raise Exception('Empty source')
-        # direct JSON text
-        if _is_json_text(s):
-            return json.loads(s)
+        # direct JSON text; the parser skips surrounding whitespace itself
+        if kind == 'json':
+            return self._parse_as('json', src, stream, stats, origin)
+        s = _strip(src)
         # URL
-        if _looks_like_url(s):
-            body, ctype = self._http_fetch(s, fetch_headers)
-            # Try JSON first
+        if kind == 'url':
+            cache = self._specCache
+            key = _SpecCache.make_key(s, fetch_headers)
+            cached = cache.get(key) if use_cache else None
+            req_headers = fetch_headers
+            if cached is not None:
+                # revalidate instead of re-downloading
+                req_headers = dict(fetch_headers)
+                if cached['etag']:
+                    req_headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    req_headers['If-Modified-Since'] = cached['last_modified']
+            meta = {}
+            body, _ = self._http_fetch(s, req_headers, meta=meta, stats=stats)
+            if cached is not None and meta.get('status') == 304:
+                self._log('Spec not modified, using cached copy: %s' % s)
+                origin.update(cached['origin'])
+                return cached['spec']
+            spec, from_body = self._parse_spec_body(s, body, fetch_headers, stream, meta.get('status'),
+                                                    meta.get('url'), stats, origin)
+            if from_body and meta.get('status') == 200:
+                resp_headers = meta.get('headers') or []
+                etag = _header_value(resp_headers, 'ETag')
+                last_modified = _header_value(resp_headers, 'Last-Modified')
+                if etag or last_modified:
+                    cache.put(key, spec, len(body or ''), etag, last_modified, origin)
+            return spec
+        # Raw pasted text but not JSON; attempt YAML
+        started = time.time()
+        spec = _parse_yaml(s)
+        origin['refs'] = _external_ref_hints('yaml', s)
+        if stats is not None:
+            stats.add_time('parse_ms', started)
+        return spec
+
+    def _parse_spec_body(self, s, body, fetch_headers, stream=False, status=200, final_url=None, stats=None,
+                         origin=None):
+        # Sniff the body once and run exactly one parser. The alternative
+        # .json URL is only fetched when the body is clearly not a spec
+        # (HTML, empty, an HTTP error, or YAML without SnakeYAML). Returns
+        # (spec, from_body); from_body is False when the spec came from the
+        # alternative URL.
+        if origin is None:
+            origin = {}
+        origin['url'] = final_url or s
+        fmt = _sniff_format(body)
+        parseable = fmt == 'json' or (fmt == 'yaml' and _SnakeYaml is not None)
+        if parseable and not (status and status >= 400):
+            return self._parse_as(fmt, body, stream, stats, origin), True
+        if fmt == 'html' and not (status and status >= 400):
+            spec = self._discover_spec_from_ui(final_url or s, body, fetch_headers, stream, stats, origin)
+            if spec is not None:
+                return spec, False
+        alt = _try_alt_json_url(s)
+        if alt is not None:
+            self._log('%s is not a spec (%s, HTTP %s); trying %s' % (s, fmt, status, alt), _DEBUG)
+            alt_meta = {}
+            body2, _ = self._http_fetch(alt, fetch_headers, meta=alt_meta, stats=stats)
+            fmt2 = _sniff_format(body2)
+            if fmt2 in ('json', 'yaml') and not (alt_meta.get('status') or 0) >= 400:
+                origin['url'] = alt_meta.get('url') or alt
+                return self._parse_as(fmt2, body2, stream, stats, origin), False
+        if status and status >= 400:
+            raise Exception('HTTP %s' % status)
+        if fmt == 'yaml':
+            # no alternative; report why the YAML could not be read
+            return self._parse_as(fmt, body, stream, stats, origin), True
+        raise Exception('Response is not a JSON or YAML spec (%s)' % fmt)
+
+    def _discover_spec_from_ui(self, page_url, html, fetch_headers, stream, stats=None, origin=None):
+        # Swagger UI page: collect spec URLs (and any inline swaggerDoc) from
+        # the page and its init scripts, then probe those plus well-known
+        # endpoints concurrently; the first valid spec wins. The fetch
+        # headers (JWT, custom headers) only go to the page's own origin;
+        # an unedited UI points at the public Petstore demo.
+        self._log('%s looks like a Swagger UI page; discovering the spec' % page_url)
+        found = _extract_ui_config(html)
+        if found['doc'] is not None:
+            self._log('Using swaggerDoc embedded in %s' % page_url)
+            return found['doc']
+        bases = _ui_base_urls(page_url)
+
+        def _headers(url):
+            return fetch_headers if _same_origin(url, page_url) else {}
+
+        scripts = []
+        for src in found['scripts']:
+            for base in bases:
+                scripts.append(urljoin(base, src))
+        # init scripts usually hold the url/urls/swaggerDoc of the UI config
+        for script_url, js, err in _iter_parallel(lambda u: self._http_fetch(u, _headers(u), stats=stats)[0],
+                                                   _unique(scripts), _DISCOVERY_CONCURRENCY):
+            if err is not None or not js:
+                continue
+            extra = _extract_ui_config(js)
+            if extra['doc'] is not None:
+                self._log('Using swaggerDoc embedded in %s' % script_url)
+                return extra['doc']
+            found['urls'].extend(extra['urls'])
+            found['configs'].extend(extra['configs'])
+
+        configured = []
+        for ref in found['urls'] + found['configs']:
+            for base in bases:
+                configured.append(urljoin(base, ref))
+        configured = _unique(configured)
+        well_known = [u for u in _well_known_spec_urls(page_url) if u not in configured]
+
+        def _probe(url, follow_config=True):
+            meta = {}
+            found_origin = {'url': url}
             try:
-                return json.loads(body)
+                body, _ = self._http_fetch(url, _headers(url), meta=meta, stats=stats)
             except Exception:
-                pass
-            # Try YAML if content-type or extension indicates YAML
+                return None
+            if (meta.get('status') or 0) >= 400:
+                return None
+            fmt = _sniff_format(body)
+            if fmt not in ('json', 'yaml'):
+                return None
             try:
-                if 'yaml' in (ctype or '').lower() or s.endswith('.yaml') or s.endswith('.yml'):
-                    return _parse_yaml(body)
+                obj = self._parse_as(fmt, body, stream, stats, found_origin)
             except Exception:
-                # if YAML parsing not available, continue
-                pass
-            # Try alternative .json path
-            alt = _try_alt_json_url(s)
-            if alt is not None:
-                try:
-                    body2, _ = self._http_fetch(alt, fetch_headers)
-                    return json.loads(body2)
-                except Exception:
-                    pass
-            # Last attempt: parse YAML regardless
+                return None
+            if _looks_like_spec(obj):
+                return url, obj, found_origin
+            if follow_config and _is_map(obj):
+                # swagger-config document: {url: ...} / {urls: [{url: ...}]}
+                for ref in _config_spec_urls(obj):
+                    res = _probe(urljoin(url, ref), False)
+                    if res is not None:
+                        return res
+            return None
+
+        # locations named by the UI config take precedence over guesses,
+        # but same-origin guesses come before another origin's document
+        local = [u for u in configured if _same_origin(u, page_url)]
+        remote = [u for u in configured if not _same_origin(u, page_url)]
+        res = None
+        for urls in (local, well_known, remote):
+            res = _first_result(_probe, urls, _DISCOVERY_CONCURRENCY)
+            if res is not None:
+                break
+        if res is None:
+            self._log('No spec found behind Swagger UI page %s' % page_url, _WARN)
+            return None
+        self._log('Discovered spec at %s' % res[0])
+        if origin is not None:
+            origin.update(res[2])
+        return res[1]
+
+    def _external_documents(self, fetch_headers, sources, stats=None):
+        # Per-import store for documents named by external $refs. The fetch
+        # headers (JWT, custom headers) are only sent to hosts the user
+        # listed as sources, never to third-party hosts a spec points at.
+        # Fetches and parses are recorded on `stats`, shared by all sources.
+        trusted = set(urlparse(src).netloc for kind, src in sources if kind == 'url')
+
+        def _load(url):
+            headers = fetch_headers if urlparse(url).netloc in trusted else {}
+            meta = {}
             try:
-                return _parse_yaml(body)
+                body, _ = self._http_fetch(url, headers, meta=meta, stats=stats)
+                if (meta.get('status') or 0) >= 400:
+                    raise Exception('HTTP %s' % meta['status'])
+                fmt = _sniff_format(body)
+                if fmt not in ('json', 'yaml'):
+                    raise Exception('not a JSON or YAML document (%s)' % fmt)
+                return self._parse_as(fmt, body, False, stats)
+            except _Cancelled:
+                raise
             except Exception as e:
-                raise Exception('Unable to parse as JSON or YAML (%s)' % e)
-        # Raw pasted text but not JSON; attempt YAML
-        return _parse_yaml(s)
-
-    def _process_spec(self, spec, jwt, custom_headers, base_override, preview=False):
-        helpers = self._helpers
+                self._log('Cannot load referenced document %s (%s)' % (url, e), _WARN)
+                raise
+        return _ExternalDocs(_load)
+
+    def _prefetch_external_refs(self, spec, origin, documents, concurrency, cancel=None):
+        # Fetch, concurrently, every document the spec references (and the
+        # ones those reference) before generation needs them.
+        refs = origin.get('refs')
+        if refs is None:
+            refs = _external_refs(spec)
+        if not refs:
+            return
+        documents.prefetch(origin.get('url'), refs, concurrency, cancel)
+        self._log('Followed %d external $ref target(s) of %s; %d document(s) loaded in this import.'
+                  % (len(refs), origin.get('url') or 'the pasted spec', len(documents)), _DEBUG)
+
+    def _parse_as(self, fmt, body, stream, stats=None, origin=None):
+        # with streaming JSON only the top level is decoded here; path items
+        # are decoded during generation and count towards generate_ms
+        started = time.time()
+        try:
+            if fmt == 'json':
+                spec = _loads_json(body, stream)
+            else:
+                spec = _parse_yaml(body)
+            if origin is not None:
+                origin['refs'] = _external_ref_hints(fmt, body)
+            return spec
+        except Exception as e:
+            raise Exception('Unable to parse as %s (%s)' % (fmt.upper(), e))
+        finally:
+            if stats is not None:
+                stats.add_time('parse_ms', started)
+
+    def _collect_options(self):
+        # Snapshot of the generation options, read once on the UI thread so
+        # worker threads never touch Swing components.
+        return {
+            'include_query': self._includeQuery.isSelected(),
+            'fill_path_params': self._fillPathParams.isSelected(),
+            'use_spec_servers': self._useSpecServers.isSelected(),
+            'use_https': self._useHttps.isSelected(),
+            'base_override': _strip(self._baseUrlField.getText()),
+            'stream_json': self._streamJson.isSelected(),
+            'fan_out_servers': self._fanOutServers.isSelected(),
+            'variants': _parse_int(self._variantsField.getText(), 0, minimum=0),
+            'variant_seed': _parse_int(self._variantSeedField.getText(), 1, minimum=0),
+        }
+
+    def _process_spec(self, spec, jwt, custom_headers, preview=False, options=None, previous=None, meta=None,
+                      cancel=None, progress=None, sink=None, documents=None, base_url=None):
+        # `previous` is {'context': digest, 'items': {op_key: item}} from the
+        # last preview import of the same source. Operations whose fingerprint
+        # is unchanged reuse their prepared item; `meta` receives the new
+        # context digest and the keys of removed operations. Generation stops
+        # between path items once `cancel` is set, keeping what was prepared;
+        # `progress(n)` is told about every _PROGRESS_STEP prepared operations.
+        # With `sink`, each prepared item is handed to sink(item) and dropped
+        # instead of being collected, and the count is returned. External
+        # $refs are resolved against `base_url` through `documents`.
         callbacks = self._callbacks
+        opts = options if options is not None else self._collect_options()
 
         is_oas3 = spec.get('openapi') is not None
         is_sw2 = spec.get('swagger') is not None
 
-        base = None
-        if _strip(base_override):
-            base = base_override
-        elif self._useSpecServers.isSelected():
-            if is_oas3:
-                base = _choose_base_from_oas3(spec)
-            elif is_sw2:
-                base = _choose_base_from_swagger2(spec)
-        # base can be relative; we'll parse host from final URLs later
-
+        # every operation is compiled once and bound to each of these bases
+        bases = _base_urls(spec, opts.get('base_override'), opts)
+        bindings = [_BaseBinding(b, opts['use_https']) for b in bases]
+        for binding in bindings:
+            if binding.error is not None:
+                self._log('URL parse error: %s (%s)' % (binding.base, binding.error), _WARN)
+        multi = len(bindings) > 1
+        if multi:
+            self._log('Binding each operation to %d base URL(s).' % len(bindings))
+
+        # Headers shared by every operation; Content-Type is added per operation
+        shared_headers = []
+        # Authorization
+        if jwt:
+            shared_headers.append(('Authorization', 'Bearer ' + jwt))
+        # Custom headers
+        for (hn, hv) in custom_headers:
+            if hn.lower() == 'authorization' and jwt:
+                continue
+            shared_headers.append((hn, hv))
+        serializer = _RequestSerializer(shared_headers)
+
+        resolver = _RefResolver(spec, documents, base_url)
+        samples = _SampleCache(resolver)
+        # everything outside the operation that shapes its request; when it
+        # changes, nothing from the previous import can be reused
+        fingerprints = _Fingerprinter(resolver)
+        context = fingerprints.digest(
+            bases, is_oas3, is_sw2,
+            [list(h) for h in shared_headers],
+            [opts.get(k) for k in ('include_query', 'fill_path_params', 'use_spec_servers', 'use_https',
+                                   'base_override', 'fan_out_servers')])
+        # boundary/negative variants per operation, streamed to `sink` only
+        variant_cap = (opts.get('variants') or 0) if sink is not None else 0
+        variant_seed = opts.get('variant_seed') or 0
+        old_items = (previous or {}).get('items') or {}
+        reusable = old_items if (previous or {}).get('context') == context else {}
+        seen = set()
+        reused = 0
+        bodies = 0
+        cancelled = False
+        reported = 0
+        templates = {}
         paths = spec.get('paths') or {}
         total = 0
+        skipped = 0
         prepared = []
 
         for raw_path, methods in paths.items():
-            if not isinstance(methods, dict):
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            if progress is not None and len(prepared) + total - reported >= _PROGRESS_STEP:
+                progress(len(prepared) + total - reported)
+                reported = len(prepared) + total
+            if _is_ref(methods):
+                # path item kept in another file ("/users: {$ref: paths/users.yaml}")
+                methods = resolver.resolve(methods)
+            if not _is_map(methods):
                 continue
 
-            # collect path-level parameters
-            path_params_defs = []
-            if 'parameters' in methods and isinstance(methods['parameters'], list):
-                path_params_defs = methods['parameters']
+            # index path-level parameters once; operations share it
+            path_params_defs = methods.get('parameters')
+            path_index = _index_params(path_params_defs, resolver)
+            path_fp = fingerprints.digest(raw_path, path_params_defs) if preview else None
 
             for method, op in methods.items():
                 if method.lower() in ('get', 'post', 'put', 'delete', 'patch', 'options', 'head'):  # actual operations
@@ -865,42 +3799,62 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
                 else:
                     continue
 
-                # merge parameters (path-level + op-level)
-                params = []
-                if isinstance(path_params_defs, list):
-                    params.extend(path_params_defs)
-                if isinstance(op_obj.get('parameters'), list):
-                    params.extend(op_obj.get('parameters'))
+                # merge parameters (op-level overrides path-level by location + name)
+                params_index = path_index
+                if _is_seq(op_obj.get('parameters')) and op_obj.get('parameters'):
+                    params_index = _index_params(op_obj.get('parameters'), resolver, path_index)
+
+                op_key = '%s %s' % (method.upper(), raw_path)
+                # one item per (operation, base); with several bases the key names the base
+                item_keys = [op_key + (' @ ' + b.base if multi else '') for b in bindings]
+                fp = None
+                status = ''
+                if preview and sink is None:
+                    seen.update(item_keys)
+                    # raw parameter lists (with $refs) determine the merged index
+                    fp = fingerprints.digest(path_fp, method.upper(), op_obj.get('parameters'),
+                                             op_obj.get('requestBody'), op_obj.get('tags'),
+                                             op_obj.get('operationId'))
+                    olds = [reusable.get(k) for k in item_keys]
+                    olds = [o for o in olds if o is not None and o.get('fp') == fp]
+                    if olds and len(olds) == len([b for b in bindings if b.host]):
+                        for old in olds:
+                            old['status'] = ''
+                            prepared.append(old)
+                        reused += len(olds)
+                        continue
+                    if previous is not None:
+                        prevs = [old_items[k] for k in item_keys if k in old_items]
+                        if not prevs:
+                            status = 'new'
+                        elif any(prev.get('fp') != fp for prev in prevs):
+                            status = 'changed'
 
                 # Build path with replaced {param}
                 final_path = raw_path
-                if self._fillPathParams.isSelected():
-                    # Extract {param} names and replace from params
-                    names = re.findall(r"\{([^}]+)\}", raw_path)
-                    for name in names:
-                        replacement = None
-                        for p in params:
-                            if p.get('in') == 'path' and p.get('name') == name:
-                                replacement = _param_example(p)
-                                break
-                        if replacement is None:
-                            replacement = '123'
-                        final_path = final_path.replace('{' + name + '}', str(replacement))
+                if opts['fill_path_params']:
+                    template = templates.get(raw_path)
+                    if template is None:
+                        template = _compile_path_template(raw_path)
+                        templates[raw_path] = template
+                    final_path = _render_path_template(template, params_index.get('path'), resolver)
 
                 # Query params
                 query_pairs = []
-                if self._includeQuery.isSelected():
-                    for p in params:
-                        if p.get('in') == 'query':
-                            v = _param_example(p)
-                            query_pairs.append((p.get('name'), v))
+                if opts['include_query']:
+                    for name, p in (params_index.get('query') or {}).items():
+                        query_pairs.append((name, _param_example(p, resolver)))
                 query = _build_query(query_pairs)
 
                 # Request body
                 body = None
                 content_type = None
+                body_schema = None
+                body_example = None
+                body_required = False
                 if is_oas3:
-                    rb = op_obj.get('requestBody') or {}
+                    rb = resolver.resolve(op_obj.get('requestBody')) or {}
+                    body_required = rb.get('required')
                     content = rb.get('content') or {}
                     # prioritize application/json
                     mt = None
@@ -911,104 +3865,110 @@ class BurpExtender(IBurpExtender, ITab, IExtensionStateListener):
                     if mt:
                         content_type = mt
                         c = content.get(mt) or {}
-                        body = _first_non_empty(c.get('example'), _safe_get(c, 'examples', 'default', 'value'))
-                        if body is None:
-                            body = _sample_value(c.get('schema') or {})
+                        body_schema = c.get('schema') or {}
+                        body = _first_non_empty(c.get('example'), _safe_get(resolver.resolve(_safe_get(c, 'examples', 'default')), 'value'))
+                        if body is not None:
+                            body_example = body
+                            body = samples.example_text(body)
+                        else:
+                            body = samples.body_text(body_schema)
                 elif is_sw2:
-                    for p in params:
-                        if p.get('in') == 'body':
-                            schema = p.get('schema') or {}
-                            body = _sample_value(schema)
-                            content_type = 'application/json'
-                            break
+                    for p in (params_index.get('body') or {}).values():
+                        body_schema = p.get('schema') or {}
+                        body_required = p.get('required')
+                        body = samples.body_text(body_schema)
+                        content_type = 'application/json'
+                        break
 
-                # Headers
-                headers = []
-                if content_type:
-                    headers.append(('Content-Type', content_type))
-                # Authorization
-                if jwt:
-                    headers.append(('Authorization', 'Bearer ' + jwt))
-                # Custom headers
-                for (hn, hv) in custom_headers:
-                    if hn.lower() == 'authorization' and jwt:
-                        continue
-                    headers.append((hn, hv))
+                if body is not None:
+                    bodies += 1
 
-                # Determine absolute URL to extract host/port/proto
-                full_url = None
-                if base:
-                    full_url = _join_url(base, final_path)
-                else:
-                    # Try from servers (oas3) with relative base
-                    if is_oas3:
-                        cand = _choose_base_from_oas3(spec)
-                        full_url = _join_url(cand or '/', final_path)
-                    else:
-                        full_url = final_path  # may be relative; we'll handle
+                caption = '%s %s' % (method.upper(), final_path)
+                tags = op_obj.get('tags')
+                tag = tags[0] if _is_seq(tags) and tags else ''
+                op_id = op_obj.get('operationId') or ''
 
-                # parse host/port/https and path
-                use_https = False
-                host = None
-                port = None
-                path_with_query = final_path + (query or '')
-                try:
-                    if full_url and (full_url.startswith('http://') or full_url.startswith('https://')):
-                        u = urlparse(full_url)
-                        host = u.hostname
-                        port = u.port
-                        use_https = True if self._useHttps.isSelected() else False
-                        if port is None:
-                            port = 443 if use_https else 80
-                        # path incl base + op path
-                        # ensure we use path from URL (which already joined base+path)
-                        base_path = u.path or '/'
-                        url_q = u.query or ''
-                        gen_q = query[1:] if (query and query.startswith('?')) else (query or '')
-                        if url_q and gen_q:
-                            combined_q = url_q + '&' + gen_q
+                # bind the base-independent parts to each base
+                for binding, item_key in zip(bindings, item_keys):
+                    if binding.host is None:
+                        # No absolute base URL; cannot determine host
+                        self._log('Skipping %s %s (no base URL / host). Set Base URL override.' % (method.upper(), final_path), _DEBUG)
+                        skipped += 1
+                        continue
+                    path_with_query = binding.path_with_query(final_path, query)
+                    if preview or sink is not None:
+                        item = _PreparedItem(method.upper(), path_with_query, binding.target, binding.host,
+                                             binding.port, binding.use_https, binding.host_header, serializer,
+                                             body, content_type, caption, tag, op_id, item_key, fp, status)
+                        if sink is not None:
+                            sink(item)
+                            total += 1
                         else:
-                            combined_q = url_q or gen_q
-                        path_with_query = base_path + (('?' + combined_q) if combined_q else '')
+                            prepared.append(item)
                     else:
-                        # No absolute base URL; cannot determine host
-                        # Skip if base override is not provided
-                        if not _strip(self._baseUrlField.getText()):
-                            self._log('Skipping %s %s (no base URL / host). Set Base URL override.' % (method.upper(), final_path))
-                            continue
-                        # fallback handled earlier when base_override not empty
-                except Exception as e:
-                    self._log('URL parse error: %s' % e)
-                    continue
-
-                # Build Host header
-                host_header = host
-                if host and ((use_https and port != 443) or ((not use_https) and port != 80)):
-                    host_header = '%s:%d' % (host, port)
-
-                # Build HTTP request bytes
-                req_bytes = _build_http_request(method, path_with_query, host_header, headers, body, helpers)
+                        # Send to Repeater immediately
+                        try:
+                            req_bytes = serializer.build(method, path_with_query, binding.host_header, content_type, body)
+                            callbacks.sendToRepeater(binding.host, binding.port, binding.use_https, req_bytes, caption)
+                            total += 1
+                        except Exception as e:
+                            self._log('Failed to send to Repeater: %s' % e, _ERROR)
 
-                caption = '%s %s' % (method.upper(), final_path)
-                if preview:
-                    label_target = ('https' if use_https else 'http') + '://' + self._format_hostport(host, port, use_https)
-                    label = '%s %s  ->  %s' % (method.upper(), path_with_query or '/', label_target)
-                    prepared.append({
-                        'host': host,
-                        'port': int(port),
-                        'use_https': use_https,
-                        'req_bytes': req_bytes,
-                        'caption': caption,
-                        'label': label
-                    })
-                else:
-                    # Send to Repeater immediately
-                    try:
-                        callbacks.sendToRepeater(host, int(port), use_https, req_bytes, caption)
+                if not variant_cap:
+                    continue
+                # variants are generated one at a time and handed straight to
+                # the sink; only the current one exists at any moment
+                body_value = body_example
+                if body_value is None and body_schema is not None:
+                    body_value = samples.value(body_schema)
+                variants = _operation_variants(op_key, variant_seed, params_index, body_schema, body_value,
+                                               body_required, resolver, opts['include_query'],
+                                               opts['fill_path_params'])
+                for label, loc, name, value in itertools.islice(variants, variant_cap):
+                    v_path, v_query, v_body = final_path, query, body
+                    if loc == 'path':
+                        v_path = _render_path_template(template, params_index.get('path'), resolver, {name: value})
+                    elif loc == 'query':
+                        v_query = _build_query([(n, _param_text(value) if n == name else v) for n, v in query_pairs
+                                                if n != name or value is not _OMIT])
+                    elif name is None:
+                        v_body = None if value is _OMIT else _body_text(value)
+                    else:
+                        obj = dict(body_value)
+                        if value is _OMIT:
+                            obj.pop(name, None)
+                        else:
+                            obj[name] = value
+                        v_body = _body_text(obj)
+                    for binding, item_key in zip(bindings, item_keys):
+                        if binding.host is None:
+                            continue
+                        path_with_query = binding.path_with_query(v_path, v_query)
+                        item = _PreparedItem(method.upper(), path_with_query, binding.target, binding.host,
+                                             binding.port, binding.use_https, binding.host_header, serializer,
+                                             v_body, content_type, '%s [%s]' % (caption, label), tag, op_id, item_key)
+                        item.req_bytes = serializer.build(item.method, path_with_query, binding.host_header,
+                                                          content_type, v_body, v_body is body)
+                        sink(item)
                         total += 1
-                    except Exception as e:
-                        self._log('Failed to send to Repeater: %s' % e)
 
+        if skipped:
+            self._log('Skipped %d operation(s) without a base URL / host. Set Base URL override.' % skipped, _WARN)
+        if progress is not None and len(prepared) + total > reported:
+            progress(len(prepared) + total - reported)
+        if cancelled:
+            self._log('Generation cancelled after %d operation(s).' % (len(prepared) + total), _DEBUG)
+        if meta is not None:
+            meta['skipped'] = skipped
+            meta['bodies'] = bodies
+            meta['reused'] = reused
+            meta['cancelled'] = cancelled
+            if preview and sink is None:
+                meta['context'] = context
+                meta['removed'] = [k for k in old_items if k not in seen]
+        if sink is not None:
+            self._log('Exported %d request(s).' % total)
+            return total
         if preview:
             try:
                 self._log('Prepared %d operations.' % len(prepared))
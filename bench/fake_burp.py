@@ -0,0 +1,254 @@
+"""Minimal stand-ins for the Burp and Swing APIs used by the extension.
+
+The extension imports `burp`, `java.*` and `javax.swing` at module level, so
+it only loads inside Burp's Jython. `install()` registers fake modules that
+are just functional enough for the benchmark to drive `BurpExtender` under
+CPython: text fields keep their text, check boxes keep their state,
+`SwingUtilities.invokeLater` runs immediately and everything else is a no-op.
+`FakeCallbacks.makeHttpRequest` talks to real sockets, so `_http_fetch` can be
+pointed at the local spec server.
+"""
+import socket
+import sys
+import types
+from array import array
+
+
+class _Anything(object):
+    # Any attribute is a callable returning another _Anything.
+    def __init__(self, *args, **kwargs):
+        for k, v in kwargs.items():
+            object.__setattr__(self, k, v)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Anything
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+    def __iter__(self):
+        return iter([])
+
+
+class _Constant(int):
+    # Class constants such as GridBagConstraints.HORIZONTAL
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+
+class _AnythingMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Constant(0)
+
+
+def _fake_class(name):
+    return _AnythingMeta(name, (_Anything,), {})
+
+
+class JTextField(_Anything):
+    def __init__(self, text='', *args, **kwargs):
+        _Anything.__init__(self, **kwargs)
+        self._text = text if isinstance(text, str) else ''
+
+    def getText(self):
+        return self._text
+
+    def setText(self, text):
+        self._text = text
+
+
+class JTextArea(JTextField):
+    def append(self, text):
+        self._text += text
+
+
+class JCheckBox(_Anything):
+    def __init__(self, text='', selected=False, **kwargs):
+        _Anything.__init__(self, **kwargs)
+        self._selected = selected
+
+    def isSelected(self):
+        return self._selected
+
+    def setSelected(self, value):
+        self._selected = value
+
+
+class JComboBox(_Anything):
+    def __init__(self, items=None, **kwargs):
+        _Anything.__init__(self, **kwargs)
+        self._items = list(items or [])
+        self._index = 0
+
+    def getSelectedItem(self):
+        return self._items[self._index] if self._items else None
+
+    def setSelectedItem(self, value):
+        self._index = self._items.index(value)
+
+    def getSelectedIndex(self):
+        return self._index
+
+
+class SwingUtilities(object):
+    @staticmethod
+    def invokeLater(runnable):
+        runnable() if callable(runnable) else runnable.run()
+
+    @staticmethod
+    def isEventDispatchThread():
+        return True
+
+
+class _FakeModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        cls = _fake_class(name)
+        setattr(self, name, cls)
+        return cls
+
+
+class _EmptyModule(types.ModuleType):
+    # java.util / SnakeYAML: absent, so the extension takes its CPython paths
+    def __getattr__(self, name):
+        raise AttributeError(name)
+
+
+_MODULES = ['burp', 'java', 'java.awt', 'java.awt.event', 'java.io', 'java.lang',
+            'javax', 'javax.swing', 'javax.swing.table', 'javax.swing.event', 'org', 'org.yaml']
+
+
+def install():
+    for name in _MODULES:
+        sys.modules[name] = _FakeModule(name)
+    swing = sys.modules['javax.swing']
+    swing.JTextField = JTextField
+    swing.JTextArea = JTextArea
+    swing.JCheckBox = JCheckBox
+    swing.JComboBox = JComboBox
+    swing.SwingUtilities = SwingUtilities
+    sys.modules['java.util'] = _EmptyModule('java.util')
+    sys.modules['org.yaml.snakeyaml'] = _EmptyModule('org.yaml.snakeyaml')
+
+
+def load_extension(path):
+    install()
+    if sys.version_info[0] < 3:
+        import imp
+        return imp.load_source('Swagger2BurpExtender', path)
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('Swagger2BurpExtender', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['Swagger2BurpExtender'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def to_bytes(text):
+    if not isinstance(text, bytes):
+        text = text.encode('latin-1', 'replace')
+    arr = array('b')
+    if hasattr(arr, 'frombytes'):
+        arr.frombytes(text)
+    else:
+        arr.fromstring(text)
+    return arr
+
+
+def from_bytes(arr):
+    raw = arr.tobytes() if hasattr(arr, 'tobytes') else arr.tostring()
+    return raw.decode('latin-1') if sys.version_info[0] >= 3 else raw
+
+
+class _ResponseInfo(object):
+    def __init__(self, raw):
+        head = from_bytes(raw).split('\r\n\r\n', 1)[0]
+        self._headers = head.split('\r\n')
+        self._offset = len(head) + 4
+        self._status = int(self._headers[0].split(' ')[1])
+
+    def getStatusCode(self):
+        return self._status
+
+    def getHeaders(self):
+        return self._headers
+
+    def getBodyOffset(self):
+        return self._offset
+
+
+class FakeHelpers(object):
+    def stringToBytes(self, text):
+        return to_bytes(text)
+
+    def bytesToString(self, arr):
+        return from_bytes(arr)
+
+    def analyzeResponse(self, raw):
+        return _ResponseInfo(raw)
+
+    def buildHttpService(self, host, port, use_https):
+        return (host, port, use_https)
+
+
+class _RequestResponse(object):
+    def __init__(self, response):
+        self._response = response
+
+    def getResponse(self):
+        return self._response
+
+
+class FakeCallbacks(object):
+    def __init__(self):
+        self.helpers = FakeHelpers()
+        self.settings = {}
+        self.repeater = 0
+
+    def getHelpers(self):
+        return self.helpers
+
+    def setExtensionName(self, name):
+        pass
+
+    def registerExtensionStateListener(self, listener):
+        pass
+
+    def addSuiteTab(self, tab):
+        pass
+
+    def customizeUiComponent(self, component):
+        pass
+
+    def createMessageEditor(self, *args):
+        return _Anything()
+
+    def saveExtensionSetting(self, key, value):
+        self.settings[key] = value
+
+    def loadExtensionSetting(self, key):
+        return self.settings.get(key)
+
+    def sendToRepeater(self, host, port, use_https, request, caption):
+        self.repeater += 1
+
+    def makeHttpRequest(self, service, request):
+        # plain HTTP only; the benchmark server never uses TLS
+        host, port, use_https = service
+        sock = socket.create_connection((host, port))
+        try:
+            sock.sendall(request.tobytes() if hasattr(request, 'tobytes') else request.tostring())
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            sock.close()
+        return _RequestResponse(to_bytes(b''.join(chunks)))
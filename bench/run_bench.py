@@ -0,0 +1,192 @@
+"""Benchmark the import pipeline outside Burp.
+
+Usage:
+    python bench/run_bench.py                         # 100, 1k and 10k operations, OAS3
+    python bench/run_bench.py --sizes 100,100000 --formats oas3,swagger2
+    python bench/run_bench.py --json bench_output.json
+
+For every size and format it generates a synthetic spec, serves it from a
+local HTTP server and times these phases:
+
+    fetch     BurpExtender._http_fetch over a real socket
+    parse     _loads_json (streaming above the usual threshold)
+    sample    _sample_value for every request-body schema
+    process   BurpExtender._process_spec (preview mode)
+    reimport  _process_spec again with the previous result (incremental path)
+    build     _item_request_bytes for every prepared item
+    build_raw _build_http_request for every prepared item (no shared encoder)
+    populate  BurpExtender._populate_requests_list
+    export    _process_spec streaming into a HAR writer (nothing retained)
+
+Each phase reports wall time, items per second and peak traced memory.
+Peak memory comes from tracemalloc, which needs Python 3. On Python 2 it is
+reported as n/a.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import fake_burp  # noqa: E402
+import spec_gen  # noqa: E402
+from spec_server import SpecServer  # noqa: E402
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+EXTENSION = os.path.join(os.path.dirname(HERE), 'Swagger2BurpExtender.py')
+
+
+class _Phase(object):
+    # Times one phase and records its peak traced allocation.
+    def __init__(self, results, size, fmt, name, count):
+        self._results = results
+        self._row = {'size': size, 'format': fmt, 'phase': name, 'items': count}
+
+    def __enter__(self):
+        gc.collect()
+        if tracemalloc is not None:
+            tracemalloc.start()
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.time() - self._start
+        peak = None
+        if tracemalloc is not None:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        row = self._row
+        row['seconds'] = round(elapsed, 4)
+        row['per_second'] = round(row['items'] / elapsed, 1) if elapsed > 0 else None
+        row['peak_mb'] = round(peak / 1048576.0, 2) if peak is not None else None
+        self._results.append(row)
+        return False
+
+
+def _body_schemas(spec):
+    schemas = []
+    for item in spec['paths'].values():
+        for method, op in item.items():
+            if method == 'parameters':
+                continue
+            if 'requestBody' in op:
+                schemas.append(op['requestBody']['content']['application/json']['schema'])
+            for p in op.get('parameters') or []:
+                if p.get('in') == 'body':
+                    schemas.append(p['schema'])
+    return schemas
+
+
+def bench_one(module, ext, server, size, fmt, args, results):
+    spec_dict = spec_gen.make_spec(size, fmt, components=args.components, depth=args.depth,
+                                   recursive=not args.no_recursive, seed=args.seed)
+    text = json.dumps(spec_dict)
+    url = server.publish('/%s-%d.json' % (fmt, size), text)
+    ops = sum(1 for item in spec_dict['paths'].values() for k in item if k != 'parameters')
+    stream = not args.no_stream
+    options = {'include_query': True, 'fill_path_params': True, 'use_spec_servers': True,
+               'use_https': False, 'base_override': '', 'stream_json': stream}
+    del spec_dict
+
+    with _Phase(results, size, fmt, 'fetch', 1):
+        body, _ = ext._http_fetch(url, {})
+    with _Phase(results, size, fmt, 'parse', ops):
+        spec = module._loads_json(body, stream)
+    del body
+
+    schemas = _body_schemas(json.loads(text))
+    resolver = module._RefResolver(spec)
+    with _Phase(results, size, fmt, 'sample', len(schemas)):
+        for schema in schemas:
+            module._sample_value(schema, resolver)
+    del schemas, resolver
+
+    meta = {}
+    with _Phase(results, size, fmt, 'process', ops):
+        items = ext._process_spec(spec, 'bench-token', [('X-Bench', '1')], True, options, meta=meta)
+    previous = {'context': meta['context'], 'items': dict((info['op_key'], info) for info in items)}
+    spec = module._loads_json(text, stream)
+    with _Phase(results, size, fmt, 'reimport', ops):
+        ext._process_spec(spec, 'bench-token', [('X-Bench', '1')], True, options, previous=previous)
+    del previous, spec
+
+    with _Phase(results, size, fmt, 'build', len(items)):
+        for info in items:
+            module._item_request_bytes(info)
+    headers = list(items[0]['serializer'].headers) if items else []
+    with _Phase(results, size, fmt, 'build_raw', len(items)):
+        for info in items:
+            module._build_http_request(info['method'], info['path'], info['host_header'], headers, info['body'])
+    with _Phase(results, size, fmt, 'populate', len(items)):
+        ext._populate_requests_list(items)
+    ext._populate_requests_list([])
+    del items
+
+    spec = module._loads_json(text, stream)
+    fd, har_path = tempfile.mkstemp(suffix='.har')
+    os.close(fd)
+    try:
+        writer = module._HarExportWriter(har_path)
+        with _Phase(results, size, fmt, 'export', ops):
+            ext._process_spec(spec, 'bench-token', [('X-Bench', '1')], True, options, sink=writer.write)
+            writer.close()
+    finally:
+        os.remove(har_path)
+
+
+def _print_table(results, out):
+    header = '%8s  %-8s  %-9s  %9s  %10s  %12s  %9s' % ('size', 'format', 'phase', 'items', 'seconds', 'items/s', 'peak MB')
+    out.write(header + '\n' + '-' * len(header) + '\n')
+    for r in results:
+        out.write('%8d  %-8s  %-9s  %9d  %10.4f  %12s  %9s\n' % (
+            r['size'], r['format'], r['phase'], r['items'], r['seconds'],
+            r['per_second'] if r['per_second'] is not None else '-',
+            r['peak_mb'] if r['peak_mb'] is not None else 'n/a'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark Swagger2Burp import phases on synthetic specs.')
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma-separated operation counts (default: %(default)s)')
+    parser.add_argument('--formats', default='oas3', help='comma-separated: oas3, swagger2 (default: %(default)s)')
+    parser.add_argument('--components', type=int, default=50, help='shared schema pool size; smaller means more $ref reuse')
+    parser.add_argument('--depth', type=int, default=3, help='nesting depth of component schemas')
+    parser.add_argument('--no-recursive', action='store_true', help='omit the self-referencing Node schema')
+    parser.add_argument('--no-stream', action='store_true', help='disable streaming JSON parsing')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    args = parser.parse_args(argv)
+
+    module = fake_burp.load_extension(EXTENSION)
+    callbacks = fake_burp.FakeCallbacks()
+    ext = module.BurpExtender()
+    ext.registerExtenderCallbacks(callbacks)
+    ext._logSink.set_level(module._WARN)
+    server = SpecServer()
+
+    results = []
+    try:
+        for fmt in [f.strip() for f in args.formats.split(',') if f.strip()]:
+            for size in [int(s) for s in args.sizes.split(',') if s.strip()]:
+                bench_one(module, ext, server, size, fmt, args, results)
+    finally:
+        server.close()
+        ext.extensionUnloaded()
+
+    _print_table(results, sys.stdout)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
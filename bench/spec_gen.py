@@ -0,0 +1,107 @@
+"""Synthetic OpenAPI 3 / Swagger 2.0 documents for benchmarking.
+
+`make_spec(operations, ...)` returns a plain dict with roughly `operations`
+operations spread over path items. The knobs:
+
+- `components`: size of the shared schema pool. Every request body is a
+  `$ref` into it, so a small pool means heavy `$ref` reuse.
+- `depth`: nesting depth of each component, as objects inside objects.
+- `recursive`: add a self-referencing `Node` schema (a tree with children
+  and a parent link). Every fifth operation uses it.
+
+The output is deterministic for a given seed.
+"""
+import random
+
+_METHODS = ['get', 'post', 'put', 'patch', 'delete']
+_SCALARS = [
+    {'type': 'string'},
+    {'type': 'string', 'format': 'date-time'},
+    {'type': 'integer', 'format': 'int64'},
+    {'type': 'number'},
+    {'type': 'boolean'},
+    {'type': 'string', 'enum': ['alpha', 'beta', 'gamma']},
+]
+
+
+def _object_schema(rng, depth, width=5):
+    props = {}
+    for i in range(width):
+        if depth > 0 and i == 0:
+            props['nested%d' % i] = _object_schema(rng, depth - 1, width)
+        elif depth > 0 and i == 1:
+            props['items%d' % i] = {'type': 'array', 'items': _object_schema(rng, depth - 1, width)}
+        else:
+            props['field%d' % i] = dict(rng.choice(_SCALARS))
+    return {'type': 'object', 'required': ['field%d' % (width - 1)], 'properties': props}
+
+
+def _ref(fmt, name):
+    if fmt == 'swagger2':
+        return {'$ref': '#/definitions/' + name}
+    return {'$ref': '#/components/schemas/' + name}
+
+
+def make_spec(operations, fmt='oas3', components=50, depth=3, recursive=True, seed=1):
+    rng = random.Random(seed)
+    schemas = {}
+    for c in range(max(1, components)):
+        schemas['Model%d' % c] = _object_schema(rng, depth)
+    if recursive:
+        schemas['Node'] = {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'children': {'type': 'array', 'items': _ref(fmt, 'Node')},
+                'parent': _ref(fmt, 'Node'),
+                'payload': _ref(fmt, 'Model0'),
+            },
+        }
+    # shared parameters, referenced from most operations
+    shared_params = {
+        'PageParam': {'name': 'page', 'in': 'query', 'required': False, 'type': 'integer', 'schema': {'type': 'integer'}},
+        'TraceHeader': {'name': 'X-Trace', 'in': 'header', 'type': 'string', 'schema': {'type': 'string'}},
+    }
+    if fmt == 'swagger2':
+        param_ref = '#/parameters/'
+    else:
+        param_ref = '#/components/parameters/'
+
+    paths = {}
+    op = 0
+    p = 0
+    while op < operations:
+        raw_path = '/resource%d/{id}/sub%d' % (p // 10, p)
+        item = {'parameters': [{'name': 'id', 'in': 'path', 'required': True, 'type': 'integer',
+                                'schema': {'type': 'integer'}}]}
+        for method in _METHODS[:min(len(_METHODS), operations - op)]:
+            body_schema = _ref(fmt, 'Node' if recursive and op % 5 == 0 else 'Model%d' % rng.randrange(len(schemas) - recursive))
+            params = [{'$ref': param_ref + 'PageParam'}, {'$ref': param_ref + 'TraceHeader'},
+                      {'name': 'q%d' % (op % 7), 'in': 'query', 'type': 'string', 'schema': {'type': 'string'}}]
+            operation = {'tags': ['tag%d' % (p % 20)], 'operationId': 'op%d' % op, 'parameters': params,
+                         'responses': {'200': {'description': 'ok'}}}
+            if method in ('post', 'put', 'patch'):
+                if fmt == 'swagger2':
+                    params.append({'name': 'body', 'in': 'body', 'schema': body_schema})
+                else:
+                    operation['requestBody'] = {'content': {'application/json': {'schema': body_schema}}}
+            item[method] = operation
+            op += 1
+        paths[raw_path] = item
+        p += 1
+
+    if fmt == 'swagger2':
+        for param in shared_params.values():
+            param.pop('schema')
+        return {'swagger': '2.0', 'info': {'title': 'bench', 'version': '1'}, 'host': '127.0.0.1:8080',
+                'basePath': '/api', 'schemes': ['http'], 'paths': paths, 'definitions': schemas,
+                'parameters': shared_params}
+    for param in shared_params.values():
+        param.pop('type')
+    for item in paths.values():
+        for operation in [item] + [v for k, v in item.items() if k in _METHODS]:
+            for param in operation.get('parameters') or []:
+                param.pop('type', None)
+    return {'openapi': '3.0.3', 'info': {'title': 'bench', 'version': '1'},
+            'servers': [{'url': 'http://127.0.0.1:8080/api'}], 'paths': paths,
+            'components': {'schemas': schemas, 'parameters': shared_params}}
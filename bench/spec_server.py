@@ -0,0 +1,53 @@
+"""Local HTTP stand-in that serves benchmark specs to `_http_fetch`."""
+import threading
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.0'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        doc = self.server.documents.get(self.path)
+        if doc is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body, ctype = doc
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class SpecServer(object):
+    def __init__(self):
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.documents = {}
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def publish(self, path, text, ctype='application/json'):
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+        self._server.documents[path] = (text, ctype)
+        return 'http://127.0.0.1:%d%s' % (self.port, path)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()